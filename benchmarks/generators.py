@@ -0,0 +1,125 @@
+import random
+
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+
+
+def _empty_graph(num_vertices, is_directed, weighted):
+    """Return a graph with vertices '0' .. 'num_vertices - 1' and no edges."""
+    graph = WeightedGraph(is_directed) if weighted else Graph(is_directed)
+    for i in range(num_vertices):
+        graph.add_vertex(str(i))
+    return graph
+
+
+def _add_edge(graph, rng, start, end, weighted, max_weight):
+    """Add an edge between two vertex numbers, with a random weight if needed."""
+    if weighted:
+        graph.add_edge(str(start), str(end), rng.randint(1, max_weight))
+    else:
+        graph.add_edge(str(start), str(end))
+
+
+def erdos_renyi(num_vertices, average_degree=4, seed=0, is_directed=False,
+        weighted=False, max_weight=100):
+    """
+    Return a random graph with `num_vertices * average_degree / 2` edges
+    between uniformly chosen pairs of distinct vertices (the G(n, m) model).
+
+    Parameters:
+    num_vertices (integer): The number of vertices.
+    average_degree (number): The average number of edges per vertex.
+    seed (integer): The seed for the random number generator.
+    is_directed (boolean): Whether the graph is directed.
+    weighted (boolean): Whether to build a WeightedGraph with random weights.
+    max_weight (integer): The largest edge weight.
+
+    Returns:
+    Graph or WeightedGraph: The generated graph.
+    """
+    rng = random.Random(seed)
+    graph = _empty_graph(num_vertices, is_directed, weighted)
+    if num_vertices < 2:
+        return graph
+    for _ in range(int(num_vertices * average_degree / 2)):
+        start = rng.randrange(num_vertices)
+        end = rng.randrange(num_vertices - 1)
+        if end >= start:
+            end += 1
+        _add_edge(graph, rng, start, end, weighted, max_weight)
+    return graph
+
+
+def grid_2d(num_vertices, seed=0, weighted=False, max_weight=100):
+    """
+    Return an undirected square grid with about `num_vertices` vertices, where
+    each vertex is joined to its right and lower neighbors.
+
+    Returns:
+    Graph or WeightedGraph: The generated graph.
+    """
+    rng = random.Random(seed)
+    side = max(1, int(round(num_vertices ** 0.5)))
+    graph = _empty_graph(side * side, False, weighted)
+    for row in range(side):
+        for col in range(side):
+            vertex = row * side + col
+            if col + 1 < side:
+                _add_edge(graph, rng, vertex, vertex + 1, weighted, max_weight)
+            if row + 1 < side:
+                _add_edge(graph, rng, vertex, vertex + side, weighted, max_weight)
+    return graph
+
+
+def barabasi_albert(num_vertices, edges_per_vertex=3, seed=0, weighted=False,
+        max_weight=100):
+    """
+    Return an undirected power-law graph grown by preferential attachment:
+    each new vertex is joined to `edges_per_vertex` existing vertices chosen
+    with probability proportional to their degree.
+
+    Returns:
+    Graph or WeightedGraph: The generated graph.
+    """
+    rng = random.Random(seed)
+    graph = _empty_graph(num_vertices, False, weighted)
+    # Every edge endpoint is listed once, so a uniform pick from this list is
+    # a pick proportional to degree.
+    endpoints = list(range(min(edges_per_vertex, num_vertices)))
+    for vertex in range(len(endpoints), num_vertices):
+        targets = set()
+        while len(targets) < min(edges_per_vertex, vertex):
+            targets.add(rng.choice(endpoints))
+        for target in targets:
+            _add_edge(graph, rng, vertex, target, weighted, max_weight)
+            endpoints.append(target)
+        endpoints.extend([vertex] * len(targets))
+    return graph
+
+
+def chain_dag(num_vertices, extra_edges_per_vertex=1, seed=0, weighted=False,
+        max_weight=100):
+    """
+    Return a directed acyclic graph made of one long path through every
+    vertex, plus random forward edges, so its depth is `num_vertices`.
+
+    Returns:
+    Graph or WeightedGraph: The generated graph.
+    """
+    rng = random.Random(seed)
+    graph = _empty_graph(num_vertices, True, weighted)
+    for vertex in range(num_vertices - 1):
+        _add_edge(graph, rng, vertex, vertex + 1, weighted, max_weight)
+        for _ in range(extra_edges_per_vertex):
+            if vertex + 2 < num_vertices:
+                target = rng.randrange(vertex + 2, num_vertices)
+                _add_edge(graph, rng, vertex, target, weighted, max_weight)
+    return graph
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'grid_2d': grid_2d,
+    'barabasi_albert': barabasi_albert,
+    'chain_dag': chain_dag,
+}
@@ -0,0 +1,176 @@
+"""
+Time every public algorithm of Graph and WeightedGraph on seeded synthetic
+graphs and write a JSON report.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 10000 100000 --output report.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.generators import GENERATORS
+
+
+# Floyd-Warshall is O(V^3), so it is only run on graphs up to this size.
+DEFAULT_MAX_FLOYD_WARSHALL_SIZE = 500
+
+
+def graph_benchmarks(graph, rng):
+    """Return (name, callable) pairs covering the Graph algorithms."""
+    vertices = graph.get_vertices()
+    start_id, target_id = rng.choice(vertices), rng.choice(vertices)
+    seeds = rng.sample(vertices, min(100, len(vertices)))
+    return [
+        ('iter_bfs', lambda: sum(1 for _ in graph.iter_bfs(start_id))),
+        ('iter_dfs', lambda: sum(1 for _ in graph.iter_dfs(start_id))),
+        ('find_shortest_path', lambda: graph.find_shortest_path(start_id, target_id)),
+        ('find_shortest_path_bidirectional',
+            lambda: graph.find_shortest_path(start_id, target_id, bidirectional=True)),
+        ('find_vertices_n_away', lambda: graph.find_vertices_n_away(start_id, 3)),
+        ('find_vertices_n_away_batch',
+            lambda: graph.find_vertices_n_away_batch(seeds, [1, 2, 3])),
+        ('find_connected_components', graph.find_connected_components),
+        ('find_strongly_connected_components', graph.find_strongly_connected_components),
+        ('is_bipartite', graph.is_bipartite),
+        ('contains_cycle', graph.contains_cycle),
+        ('topological_sort', graph.topological_sort),
+        ('freeze', graph.freeze),
+    ]
+
+
+def weighted_graph_benchmarks(graph, rng, max_floyd_warshall_size):
+    """Return (name, callable) pairs covering the WeightedGraph algorithms."""
+    vertices = list(graph.vertex_dict)
+    start_id, target_id = rng.choice(vertices), rng.choice(vertices)
+    benchmarks = [
+        ('dijkstra_find_shortest_path',
+            lambda: graph.find_shortest_path(start_id, target_id, return_path=True)),
+        ('dijkstra_shortest_path_tree', lambda: graph.shortest_path_tree(start_id)),
+        ('minimum_spanning_tree_kruskal', graph.minimum_spanning_tree_kruskal),
+        ('minimum_spanning_tree_prim', graph.minimum_spanning_tree_prim),
+    ]
+    if len(vertices) <= max_floyd_warshall_size:
+        benchmarks.append(('floyd_warshall', graph.floyd_warshall))
+    return benchmarks
+
+
+def measure(function, track_memory):
+    """
+    Run `function` once and return its wall time in seconds and, if
+    `track_memory`, the peak memory it allocated in bytes (from a second run,
+    so tracing does not skew the timing).
+    """
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+
+    peak_bytes = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            function()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_bytes
+
+
+def run(sizes, families, seed=0, track_memory=True,
+        max_floyd_warshall_size=DEFAULT_MAX_FLOYD_WARSHALL_SIZE, log=None):
+    """
+    Run every benchmark for each graph family and size.
+
+    Parameters:
+    sizes (list<integer>): The approximate numbers of vertices to test.
+    families (list<string>): Names of generators from GENERATORS.
+    seed (integer): The seed for the generators and the query vertices.
+    track_memory (boolean): Whether to record peak memory per benchmark.
+    max_floyd_warshall_size (integer): The largest graph to run
+        Floyd-Warshall on.
+    log (file): Where to print progress, if anywhere.
+
+    Returns:
+    list<dict>: One record per (family, size, graph kind, algorithm).
+    """
+    results = []
+    for family in families:
+        generator = GENERATORS[family]
+        for size in sizes:
+            for weighted in (False, True):
+                start = time.perf_counter()
+                graph = generator(size, seed=seed, weighted=weighted)
+                build_seconds = time.perf_counter() - start
+
+                rng = random.Random(seed)
+                if weighted:
+                    kind = 'WeightedGraph'
+                    benchmarks = weighted_graph_benchmarks(graph, rng,
+                        max_floyd_warshall_size)
+                    num_edges = sum(len(vertex.neighbors_dict)
+                        for vertex in graph.get_vertices())
+                else:
+                    kind = 'Graph'
+                    benchmarks = graph_benchmarks(graph, rng)
+                    num_edges = sum(len(neighbors)
+                        for neighbors in graph.vertex_dict.values())
+
+                for name, function in benchmarks:
+                    record = {
+                        'family': family,
+                        'size': size,
+                        'graph': kind,
+                        'vertices': len(graph.vertex_dict),
+                        'edges': num_edges,
+                        'build_seconds': build_seconds,
+                        'algorithm': name,
+                    }
+                    try:
+                        record['seconds'], record['peak_bytes'] = \
+                            measure(function, track_memory)
+                    except Exception as error: # e.g. topological sort of a cyclic graph
+                        record['error'] = f'{type(error).__name__}: {error}'
+                    results.append(record)
+                    if log is not None:
+                        print(f"{family:>16} {size:>8} {kind:>13} {name:<36} "
+                            f"{record.get('seconds', float('nan')):10.4f}s", file=log)
+    return results
+
+
+def main(argv=None):
+    """Parse the command line, run the benchmarks and write the report."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the graph algorithms on synthetic graphs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+        help='approximate numbers of vertices (default: 1000 10000)')
+    parser.add_argument('--families', nargs='+', choices=sorted(GENERATORS),
+        default=sorted(GENERATORS), help='graph generators to use (default: all)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+        help='skip the peak memory measurements')
+    parser.add_argument('--max-floyd-warshall-size', type=int,
+        default=DEFAULT_MAX_FLOYD_WARSHALL_SIZE)
+    parser.add_argument('--output', default='benchmark_report.json',
+        help='where to write the JSON report')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.families, args.seed, not args.no_memory,
+        args.max_floyd_warshall_size, log=sys.stderr)
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from graphs.csr_graph import CSRGraph
+
+
+# The frozen adjacency each worker process reads, set up by `_attach_worker`.
+_worker_state = {}
+
+
+def all_pairs_bfs(graph, sources=None, max_workers=None, chunksize=64):
+    """
+    Find the unweighted distance from each source vertex to every vertex,
+    spreading the sources over a pool of worker processes.
+
+    The graph is frozen once and its CSR arrays are copied into shared memory,
+    which every worker maps instead of receiving a pickled copy. Results are
+    yielded as soon as each chunk of sources is done.
+
+    Parameters:
+    graph (Graph or CSRGraph): The graph to search.
+    sources (iterable<string>): The ids of the source vertices; defaults to
+        every vertex.
+    max_workers (integer): The number of worker processes; defaults to the
+        number of CPUs. With 1, the searches run in this process.
+    chunksize (integer): How many sources each task handles.
+
+    Returns:
+    generator: (source id, distances) pairs, in source order. `distances` is
+    an array of ints indexed like `graph.get_vertices()`, with -1 for vertices
+    that cannot be reached.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    if sources is None:
+        source_indices = list(range(len(graph)))
+    else:
+        source_indices = []
+        for source_id in sources:
+            if source_id not in graph.index:
+                raise KeyError("The start vertex is not in the graph!")
+            source_indices.append(graph.index[source_id])
+    return _all_pairs_bfs(graph, source_indices, max_workers, chunksize)
+
+
+def distance_matrix(graph, max_workers=None):
+    """
+    Return the all-pairs unweighted distance matrix of `graph`.
+
+    Parameters:
+    graph (Graph or CSRGraph): The graph to search.
+    max_workers (integer): The number of worker processes.
+
+    Returns:
+    tuple: The list of distance rows, where `dist[i][j]` is the number of
+    edges from the vertex with index i to the vertex with index j (-1 if it
+    cannot be reached), and a dictionary mapping each vertex id to its index.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+    rows = [distances for _, distances
+        in all_pairs_bfs(graph, max_workers=max_workers)]
+    index = {vertex_id: i for i, vertex_id in enumerate(graph.ids)}
+    return rows, index
+
+
+def _all_pairs_bfs(graph, source_indices, max_workers, chunksize):
+    """Generator behind `all_pairs_bfs`."""
+    ids = graph.ids
+    if max_workers == 1:
+        for source in source_indices:
+            yield ids[source], bfs_distances(graph.offsets, graph.targets, source)
+        return
+
+    offsets = array('q', graph.offsets)
+    targets = array('i', graph.targets)
+    blocks = [_share(offsets), _share(targets)]
+    try:
+        with ProcessPoolExecutor(max_workers, initializer=_attach_worker,
+                initargs=(blocks[0].name, len(offsets), blocks[1].name,
+                len(targets))) as executor:
+            chunks = [source_indices[i:i + chunksize]
+                for i in range(0, len(source_indices), chunksize)]
+            try:
+                for chunk, results in zip(chunks, executor.map(_bfs_chunk, chunks)):
+                    for source, distances in zip(chunk, results):
+                        yield ids[source], distances
+            finally:
+                executor.shutdown(cancel_futures=True)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _share(data):
+    """Copy an array into a new shared memory block and return the block."""
+    block = shared_memory.SharedMemory(create=True,
+        size=max(1, len(data) * data.itemsize))
+    block.buf[:len(data) * data.itemsize] = data.tobytes()
+    return block
+
+
+def _attach_worker(offsets_name, num_offsets, targets_name, num_targets):
+    """Map the shared CSR arrays into this worker process."""
+    offsets_block = shared_memory.SharedMemory(name=offsets_name)
+    targets_block = shared_memory.SharedMemory(name=targets_name)
+    _worker_state['blocks'] = (offsets_block, targets_block)
+    _worker_state['offsets'] = offsets_block.buf[:num_offsets * 8].cast('q')
+    _worker_state['targets'] = targets_block.buf[:num_targets * 4].cast('i')
+
+
+def _bfs_chunk(sources):
+    """Run a BFS from each source index against the shared adjacency."""
+    offsets, targets = _worker_state['offsets'], _worker_state['targets']
+    return [bfs_distances(offsets, targets, source) for source in sources]
+
+
+def bfs_distances(offsets, targets, source):
+    """
+    Return the number of edges from the vertex with index `source` to every
+    vertex of a CSR adjacency, with -1 for vertices that cannot be reached.
+    """
+    distances = array('i', [-1]) * (len(offsets) - 1)
+    distances[source] = 0
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for vertex in frontier:
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if distances[neighbor] == -1:
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
@@ -0,0 +1,49 @@
+from graphs.disjoint_set import DisjointSet
+
+
+class ComponentTrackingMixin:
+    """
+    Adds opt-in, incrementally maintained connectivity to a graph class.
+
+    While tracking is enabled the class keeps a DisjointSet in `components`,
+    adding to it in `add_vertex` and joining sets in `add_edge`, so the
+    queries below never traverse the graph. Edges are treated as undirected,
+    so directed graphs are split into weakly connected components.
+
+    The class must key `vertex_dict` by vertex id, provide `_edge_ids()`, and
+    set `components` to None and `components_stale` to False on creation.
+    A change that removes edges should set `components_stale`, since sets
+    cannot be split; the next query then rebuilds them.
+    """
+    def enable_component_tracking(self):
+        """Start tracking connected components as the graph changes."""
+        components = DisjointSet(self.vertex_dict)
+        for start_id, end_id in self._edge_ids():
+            components.union(start_id, end_id)
+        self.components = components
+        self.components_stale = False
+
+    def disable_component_tracking(self):
+        """Stop tracking connected components."""
+        self.components = None
+        self.components_stale = False
+
+    def same_component(self, vertex_id1, vertex_id2):
+        """Return True if the two vertices are in the same component."""
+        return self._tracked_components().connected(vertex_id1, vertex_id2)
+
+    def component_count(self):
+        """Return the number of connected components."""
+        return self._tracked_components().num_sets
+
+    def component_size(self, vertex_id):
+        """Return the number of vertices in the component of `vertex_id`."""
+        return self._tracked_components().set_size(vertex_id)
+
+    def _tracked_components(self):
+        """Return the up-to-date DisjointSet of components."""
+        if self.components is None:
+            raise ValueError('Component tracking is not enabled.')
+        if self.components_stale:
+            self.enable_component_tracking()
+        return self.components
@@ -0,0 +1,368 @@
+import struct
+from array import array
+from heapq import heappop, heappush
+
+from util.snapshot import SectionReader, decode_ids, encode_ids, write_binary_file
+
+
+# Hierarchy file layout, in the shared format of `write_binary_file`:
+#
+#   header       magic, version, vertex count, up edge count, down edge
+#                count, id bytes
+#   rank         int64[V]        contraction order of each vertex
+#   up           offsets int64[V + 1], weights float64[E], targets int32[E],
+#                middles int32[E]
+#   down         the same four arrays for the downward edges
+#   id_offsets   int64[V + 1]    start of each id in the id blob
+#   id_blob      bytes           the UTF-8 encoded ids, back to back
+MAGIC = b'GRAPHCHY'
+VERSION = 1
+HEADER = struct.Struct('<8sIqqqq')
+
+
+class ContractionHierarchy:
+    """ ContractionHierarchy Class
+    A preprocessed weighted graph answering shortest path queries by
+    searching only a tiny part of it.
+
+    Vertices are contracted one at a time, least important first. Contracting
+    a vertex removes it and adds a shortcut edge between any two of its
+    neighbors whose only shortest connection ran through it. A query then
+    runs Dijkstra forwards from the start and backwards from the target,
+    each only ever moving to more important vertices, and the two searches
+    meet at the most important vertex of the shortest path.
+
+    Every edge stores the `middle` vertex it shortcuts (-1 for an original
+    edge), so paths are unpacked back into original edges after a query.
+    """
+    INFINITY = float('inf')
+
+    def __init__(self, ids, rank, up, down):
+        """
+        Initialize a hierarchy from its CSR arrays.
+
+        Parameters:
+        ids (list<string>): The vertex ids, in index order.
+        rank (array<int>): The contraction order of each vertex.
+        up (tuple): (offsets, targets, weights, middles) of the edges from
+            each vertex to more important vertices.
+        down (tuple): (offsets, targets, weights, middles) of the edges into
+            each vertex from more important vertices, stored under the less
+            important end so the backward search can follow them.
+        """
+        self.ids = ids
+        self.index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        self.rank = rank
+        self.up = up
+        self.down = down
+
+    @classmethod
+    def build(cls, graph, witness_limit=50):
+        """
+        Contract every vertex of `graph` and return the hierarchy.
+
+        Vertices are contracted in order of their edge difference (shortcuts
+        added minus edges removed) plus the number of their neighbors already
+        contracted, which spreads contraction evenly over the graph. The
+        priority of a vertex is only recomputed when it reaches the top of the
+        queue; if it got worse it is pushed back instead of contracted.
+
+        Parameters:
+        graph (WeightedGraph): The graph to preprocess. Weights must not be
+            negative.
+        witness_limit (integer): How many vertices a witness search may
+            settle before giving up and adding the shortcut anyway. Lower is
+            faster to build but adds more, unneeded, shortcuts.
+
+        Returns:
+        ContractionHierarchy: The hierarchy for `graph`.
+        """
+        frozen = graph.freeze()
+        n = len(frozen)
+
+        # The remaining graph, shrinking as vertices are contracted. Parallel
+        # edges keep the lightest weight and self-loops are dropped.
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        offsets, targets, weights = frozen.offsets, frozen.targets, frozen.weights
+        for u in range(n):
+            for k in range(offsets[u], offsets[u + 1]):
+                v, weight = targets[k], weights[k]
+                if u != v and weight < out_edges[u].get(v, cls.INFINITY):
+                    out_edges[u][v] = weight
+                    in_edges[v][u] = weight
+        middles = {} # (u, v) -> the vertex a shortcut edge skips
+
+        def find_shortcuts(vertex):
+            """Return the (u, x, weight) shortcuts contracting `vertex` needs."""
+            shortcuts = []
+            outgoing = out_edges[vertex]
+            if not outgoing:
+                return shortcuts
+            max_outgoing = max(outgoing.values())
+            for u, weight_in in in_edges[vertex].items():
+                witness = _witness_search(out_edges, u, vertex,
+                    weight_in + max_outgoing, witness_limit)
+                for x, weight_out in outgoing.items():
+                    if x != u and witness.get(x, cls.INFINITY) > weight_in + weight_out:
+                        shortcuts.append((u, x, weight_in + weight_out))
+            return shortcuts
+
+        contracted_neighbors = [0] * n
+
+        def priority(vertex, shortcuts):
+            """Return the edge difference of `vertex` plus its contracted neighbors."""
+            return len(shortcuts) - len(in_edges[vertex]) - \
+                len(out_edges[vertex]) + contracted_neighbors[vertex]
+
+        queue = [(priority(vertex, find_shortcuts(vertex)), vertex)
+            for vertex in range(n)]
+        queue.sort()
+        rank = array('q', bytes(8 * n))
+        up_edges = [None] * n # vertex -> [(target, weight, middle)]
+        down_edges = [None] * n
+        next_rank = 0
+
+        while queue:
+            _, vertex = heappop(queue)
+            shortcuts = find_shortcuts(vertex)
+            current = priority(vertex, shortcuts)
+            if queue and current > queue[0][0]:
+                heappush(queue, (current, vertex))
+                continue
+
+            rank[vertex] = next_rank
+            next_rank += 1
+
+            # Every remaining neighbor will be contracted later, so its edges
+            # with this vertex are the ones the queries follow upwards.
+            up_edges[vertex] = [(x, weight, middles.get((vertex, x), -1))
+                for x, weight in out_edges[vertex].items()]
+            down_edges[vertex] = [(u, weight, middles.get((u, vertex), -1))
+                for u, weight in in_edges[vertex].items()]
+
+            for x in out_edges[vertex]:
+                del in_edges[x][vertex]
+                contracted_neighbors[x] += 1
+            for u in in_edges[vertex]:
+                del out_edges[u][vertex]
+                contracted_neighbors[u] += 1
+            out_edges[vertex] = {}
+            in_edges[vertex] = {}
+
+            for u, x, weight in shortcuts:
+                if weight < out_edges[u].get(x, cls.INFINITY):
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+                    middles[(u, x)] = vertex
+
+        return cls(frozen.ids, rank, _to_csr(up_edges), _to_csr(down_edges))
+
+    def find_shortest_path(self, start_id, target_id, return_path=False):
+        """
+        Return the total weight of the shortest path from a start vertex to a
+        destination.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+        return_path (boolean): Whether to also return the vertex path.
+
+        Returns:
+        number: The total weight of the shortest path, or INFINITY if the
+        target cannot be reached. If `return_path` is True, a tuple of the
+        weight and the list of vertex ids from start to end (None if the
+        target cannot be reached).
+        """
+        if start_id not in self.index:
+            raise KeyError("The start vertex is not in the graph!")
+        if target_id not in self.index:
+            raise KeyError("The target vertex is not in the graph!")
+        start, target = self.index[start_id], self.index[target_id]
+
+        # Index 0 is the forward search over upward edges from the start,
+        # index 1 the backward search over downward edges from the target.
+        # Parents are (previous vertex, middle) of the edge that reached a
+        # vertex.
+        graphs = (self.up, self.down)
+        distances = ({start: 0}, {target: 0})
+        parents = ({start: None}, {target: None})
+        heaps = ([(0, start)], [(0, target)])
+        best, meeting_vertex = self.INFINITY, None
+
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or
+                heaps[0][0][0] <= heaps[1][0][0]) else 1
+            distance, vertex = heappop(heaps[side])
+            if distance >= best:
+                # Searching upwards, this side cannot find anything shorter.
+                heaps[side].clear()
+                continue
+            if distance > distances[side][vertex]:
+                continue # stale entry
+
+            other_distance = distances[1 - side].get(vertex)
+            if other_distance is not None and distance + other_distance < best:
+                best, meeting_vertex = distance + other_distance, vertex
+
+            offsets, targets, weights, middles = graphs[side]
+            side_distances, side_parents = distances[side], parents[side]
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[k]
+                new_distance = distance + weights[k]
+                if new_distance < side_distances.get(neighbor, self.INFINITY):
+                    side_distances[neighbor] = new_distance
+                    side_parents[neighbor] = (vertex, middles[k])
+                    heappush(heaps[side], (new_distance, neighbor))
+
+        if not return_path:
+            return best
+        if meeting_vertex is None:
+            return best, None
+
+        # The hierarchy edges of the path, in order, as (from, to, middle).
+        edges = []
+        vertex = meeting_vertex
+        while parents[0][vertex] is not None:
+            previous, middle = parents[0][vertex]
+            edges.append((previous, vertex, middle))
+            vertex = previous
+        edges.reverse()
+        vertex = meeting_vertex
+        while parents[1][vertex] is not None:
+            following, middle = parents[1][vertex]
+            edges.append((vertex, following, middle))
+            vertex = following
+
+        path = [start]
+        for edge in edges:
+            self._unpack_edge(edge, path)
+        return best, [self.ids[i] for i in path]
+
+    def _unpack_edge(self, edge, path):
+        """
+        Append the vertices of the original path an edge stands for, after its
+        first vertex, to `path`.
+        """
+        stack = [edge]
+        while stack:
+            start, end, middle = stack.pop()
+            if middle == -1:
+                path.append(end)
+                continue
+            # The middle vertex was contracted before both ends, so the two
+            # halves are stored under it: start -> middle as a downward edge
+            # and middle -> end as an upward one.
+            stack.append((middle, end, _edge_middle(self.up, middle, end)))
+            stack.append((start, middle, _edge_middle(self.down, middle, start)))
+
+    def num_shortcuts(self):
+        """Return the number of shortcut edges the hierarchy added."""
+        return sum(1 for middle in self.up[3] if middle != -1) + \
+            sum(1 for middle in self.down[3] if middle != -1)
+
+    def save(self, filename):
+        """
+        Write the hierarchy to `filename` in a binary format.
+
+        Vertex ids are stored as strings.
+
+        Parameters:
+        filename (string): The path of the file to write.
+        """
+        encoded_ids, id_offsets = encode_ids(self.ids)
+        sections = [array('q', self.rank)]
+        for offsets, targets, weights, middles in (self.up, self.down):
+            sections.extend([array('q', offsets), array('d', weights),
+                array('i', targets), array('i', middles)])
+        sections.append(id_offsets)
+
+        header = HEADER.pack(MAGIC, VERSION, len(self.ids), len(self.up[1]),
+            len(self.down[1]), id_offsets[-1])
+        write_binary_file(filename, header, sections, encoded_ids)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read a hierarchy written by `save`.
+
+        Parameters:
+        filename (string): The path of the file to read.
+
+        Returns:
+        ContractionHierarchy: The hierarchy, keyed by string vertex ids.
+        """
+        with open(filename, 'rb') as hierarchy_file:
+            data = hierarchy_file.read()
+
+        reader = SectionReader(data, HEADER, MAGIC, VERSION,
+            'contraction hierarchy')
+        num_vertices, num_up, num_down, id_bytes = reader.fields
+        rank = reader.section('q', num_vertices)
+        csr = []
+        for num_edges in (num_up, num_down):
+            offsets = reader.section('q', num_vertices + 1)
+            weights = reader.section('d', num_edges)
+            targets = reader.section('i', num_edges)
+            middles = reader.section('i', num_edges)
+            csr.append((offsets, targets, weights, middles))
+        id_offsets = reader.section('q', num_vertices + 1)
+        ids = decode_ids(reader.blob(id_bytes), id_offsets)
+        return cls(ids, rank, csr[0], csr[1])
+
+
+def _witness_search(out_edges, source, excluded, max_distance, max_settled):
+    """
+    Run a bounded Dijkstra from `source` that avoids the vertex `excluded`.
+
+    Returns:
+    dict: The best distance found so far to each vertex reached. These are
+    lengths of real paths, so any of them can serve as a witness.
+    """
+    distances = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    while heap and settled < max_settled:
+        distance, vertex = heappop(heap)
+        if distance > distances[vertex]:
+            continue
+        if distance > max_distance:
+            break
+        settled += 1
+        for neighbor, weight in out_edges[vertex].items():
+            if neighbor == excluded:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, ContractionHierarchy.INFINITY):
+                distances[neighbor] = new_distance
+                heappush(heap, (new_distance, neighbor))
+    return distances
+
+
+def _to_csr(edge_lists):
+    """
+    Pack per-vertex lists of (target, weight, middle) into CSR arrays.
+
+    Returns:
+    tuple: (offsets, targets, weights, middles).
+    """
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d')
+    middles = array('i')
+    for edges in edge_lists:
+        for target, weight, middle in edges:
+            targets.append(target)
+            weights.append(weight)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middles
+
+
+def _edge_middle(csr, vertex, target):
+    """Return the middle of the stored edge from `vertex` to `target`."""
+    offsets, targets, _, middles = csr
+    for k in range(offsets[vertex], offsets[vertex + 1]):
+        if targets[k] == target:
+            return middles[k]
+    raise KeyError(f'No hierarchy edge between vertices {vertex} and {target}')
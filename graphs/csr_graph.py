@@ -0,0 +1,565 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+
+
+class CSRGraph:
+    """ CSRGraph Class
+    Represents a frozen (read-only) directed or undirected graph in compressed
+    sparse row form.
+
+    Vertex ids are interned to dense integer indices. The neighbors of the
+    vertex with index `i` are `targets[offsets[i]:offsets[i + 1]]`, so the
+    whole adjacency lives in two flat arrays instead of a dict of lists.
+    """
+    def __init__(self, ids, offsets, targets, is_directed=True, index=None,
+            weights=None):
+        """
+        Initialize a frozen graph from its interned ids and CSR arrays.
+
+        Parameters:
+        ids (list<string>): The vertex ids, in index order.
+        offsets (array<int>): Start of each vertex's neighbors in `targets`,
+            with one extra trailing entry holding the total number of edges.
+        targets (array<int>): The neighbor indices of every vertex, back to back.
+        is_directed (boolean): Whether the graph is directed.
+        index (dict<string, int>): Optional id -> index map; built from `ids`
+            if not given.
+        weights (array<float>): Optional edge weights, parallel to `targets`.
+        """
+        self.ids = ids
+        self.index = index if index is not None else {
+            vertex_id: i for i, vertex_id in enumerate(ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.is_directed = is_directed
+        self._reverse = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build a frozen copy of `graph`.
+
+        For undirected graphs every edge is stored in both directions, so
+        neighbor lookups never need the reverse index.
+
+        Parameters:
+        graph (Graph): The graph to freeze.
+
+        Returns:
+        CSRGraph: The frozen graph.
+        """
+        ids = graph.get_vertices()
+        index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        offsets = array('q', [0])
+        targets = array('i')
+        for vertex_id in ids:
+            targets.extend(index[neighbor_id]
+                for neighbor_id in graph.get_neighbors(vertex_id))
+            offsets.append(len(targets))
+        return cls(ids, offsets, targets, graph.is_directed, index)
+
+    @classmethod
+    def from_weighted_graph(cls, graph):
+        """
+        Build a frozen copy of the weighted graph `graph`, storing the edge
+        weights in an array parallel to the targets.
+
+        Parameters:
+        graph (WeightedGraph): The graph to freeze.
+
+        Returns:
+        CSRGraph: The frozen graph.
+        """
+        ids = list(graph.vertex_dict.keys())
+        index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for vertex in graph.get_vertices():
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                targets.append(index[neighbor.id])
+                weights.append(weight)
+            offsets.append(len(targets))
+        return cls(ids, offsets, targets, graph.is_directed, index, weights)
+
+    def is_weighted(self):
+        """Return True if the graph stores edge weights."""
+        return self.weights is not None
+
+    def thaw(self):
+        """
+        Return a mutable Graph (or WeightedGraph, if the graph is weighted)
+        with the same vertices and edges.
+        """
+        from graphs.graph import Graph
+        from graphs.weighted_graph import WeightedGraph
+
+        ids, offsets, targets = self.ids, self.offsets, self.targets
+        graph = WeightedGraph(self.is_directed) if self.is_weighted() \
+            else Graph(self.is_directed)
+        for vertex_id in ids:
+            graph.add_vertex(vertex_id)
+
+        for i, vertex_id in enumerate(ids):
+            self_loop = False
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                if self.is_weighted():
+                    graph.add_edge(vertex_id, ids[j], self.weights[k])
+                elif self.is_directed or j > i or (j == i and self_loop):
+                    # Undirected edges are stored in both directions here but
+                    # only once in a Graph, so keep a single copy of each.
+                    graph.add_edge(vertex_id, ids[j])
+                if j == i:
+                    self_loop = not self_loop
+        return graph
+
+    def __len__(self):
+        """Return the number of vertices in the graph."""
+        return len(self.ids)
+
+    def num_edges(self):
+        """Return the number of stored (directed) edges."""
+        return len(self.targets)
+
+    def contains_vertex(self, vertex_id):
+        """Return True if the vertex is contained in the graph."""
+        return vertex_id in self.index
+
+    def contains_edge(self, start_id, end_id):
+        """
+        Return True if the edge is contained in the graph from vertex `start_id`
+        to vertex `end_id`.
+        """
+        if end_id not in self.index:
+            return False
+        return self.index[end_id] in self._neighbor_indices(self.index[start_id])
+
+    def get_vertices(self):
+        """
+        Return all vertices in the graph.
+
+        Returns:
+        list<string>: The vertex ids contained in the graph.
+        """
+        return list(self.ids)
+
+    def get_neighbors(self, start_id):
+        """
+        Return a list of neighbors to the vertex `start_id`.
+
+        Returns:
+        list<string>: The neigbors of the start vertex.
+        """
+        ids = self.ids
+        return [ids[i] for i in self._neighbor_indices(self.index[start_id])]
+
+    def iter_neighbors_with_weights(self, start_id):
+        """
+        Iterate over the (neighbor id, weight) pairs of the vertex `start_id`
+        of a weighted graph, reading the arrays in place.
+        """
+        if not self.is_weighted():
+            raise ValueError('Graph is not weighted.')
+        ids, targets, weights = self.ids, self.targets, self.weights
+        i = self.index[start_id]
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            yield ids[targets[k]], weights[k]
+
+    def _neighbor_indices(self, i):
+        """Return the neighbor indices of the vertex with index `i`."""
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def _start_index(self, start_id):
+        """Return the index of `start_id`, raising KeyError if it is missing."""
+        if start_id not in self.index:
+            raise KeyError("The start vertex is not in the graph!")
+        return self.index[start_id]
+
+    def reverse(self):
+        """
+        Return a CSRGraph with every edge reversed, sharing this graph's ids.
+
+        The result is cached, since it is needed by traversals that follow
+        edges backwards.
+        """
+        if not self.is_directed:
+            return self
+        if self._reverse is None:
+            n = len(self.ids)
+            offsets, targets = self.offsets, self.targets
+
+            # Count the in-degree of each vertex, then prefix-sum into offsets.
+            reverse_offsets = array('q', bytes(8 * (n + 1)))
+            for j in targets:
+                reverse_offsets[j + 1] += 1
+            for i in range(n):
+                reverse_offsets[i + 1] += reverse_offsets[i]
+
+            reverse_targets = array('i', bytes(4 * len(targets)))
+            reverse_weights = None
+            if self.is_weighted():
+                reverse_weights = array('d', bytes(8 * len(targets)))
+            fill = array('q', reverse_offsets[:n])
+            for i in range(n):
+                for k in range(offsets[i], offsets[i + 1]):
+                    j = targets[k]
+                    reverse_targets[fill[j]] = i
+                    if reverse_weights is not None:
+                        reverse_weights[fill[j]] = self.weights[k]
+                    fill[j] += 1
+
+            self._reverse = CSRGraph(self.ids, reverse_offsets,
+                reverse_targets, True, self.index, reverse_weights)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def __str__(self):
+        """Return a string representation of the graph."""
+        graph_repr = [f'{vertex} -> {self.get_neighbors(vertex)}'
+            for vertex in self.ids]
+        return 'CSRGraph with vertices: \n' + '\n'.join(graph_repr)
+
+    def __repr__(self):
+        """Return a string representation of the graph."""
+        return self.__str__()
+
+    def bfs_traversal(self, start_id):
+        """
+        Traverse the graph using breadth-first search, printing each vertex.
+        """
+        start = self._start_index(start_id)
+        ids, offsets, targets = self.ids, self.offsets, self.targets
+
+        seen = bytearray(len(ids))
+        seen[start] = 1
+        queue = deque([start])
+
+        while queue:
+            vertex = queue.popleft()
+            print('Processing vertex {}'.format(ids[vertex]))
+
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    queue.append(neighbor)
+
+    def find_shortest_path(self, start_id, target_id):
+        """
+        Find and return the shortest path from start_id to target_id.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+
+        Returns:
+        list<string>: A list of all vertex ids in the shortest path, from start
+        to end, or None if the target cannot be reached.
+        """
+        start = self._start_index(start_id)
+        if target_id not in self.index:
+            raise KeyError("The target vertex is not in the graph!")
+        target = self.index[target_id]
+        offsets, targets = self.offsets, self.targets
+
+        # Only a parent pointer is stored per vertex; the path is rebuilt once.
+        parent = array('q', [-1]) * len(self.ids)
+        parent[start] = start
+        queue = deque([start])
+
+        while queue:
+            vertex = queue.popleft()
+            if vertex == target:
+                break
+
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if parent[neighbor] == -1:
+                    parent[neighbor] = vertex
+                    queue.append(neighbor)
+
+        if parent[target] == -1:
+            return None
+
+        path = [target]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        return [self.ids[i] for i in reversed(path)]
+
+    def shortest_path_tree(self, start_id, target_ids=None):
+        """
+        Find the shortest paths from a start vertex to every vertex it can
+        reach, with Dijkstra's Algorithm on a weighted graph and breadth-first
+        search (counting edges) otherwise.
+
+        Distances and parents are kept in flat arrays indexed by vertex, and
+        the heap holds (distance, index) pairs, so no per-vertex objects are
+        created during the search.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_ids (iterable<string>): Optionally, stop as soon as the
+            shortest paths to all of these vertices are known. Vertices
+            farther away may then be missing from the result.
+
+        Returns:
+        tuple<dict, dict>: A dictionary mapping each reachable vertex id to its
+        distance from the start, and a dictionary mapping each reachable vertex
+        id to its predecessor on a shortest path (None for the start vertex).
+        """
+        start = self._start_index(start_id)
+        remaining = None
+        if target_ids is not None:
+            remaining = {self.index[target_id] for target_id in target_ids
+                if target_id in self.index}
+        if not self.is_weighted():
+            return self._bfs_tree(start, remaining)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        n = len(self.ids)
+
+        infinity = float('inf')
+        distance = array('d', [infinity]) * n
+        parent = array('q', [-1]) * n
+        settled = bytearray(n)
+        order = [] # the settled vertices, nearest first
+        distance[start] = 0
+        heap = [(0.0, start)]
+
+        while heap:
+            vertex_distance, vertex = heappop(heap)
+            if settled[vertex]:
+                continue
+            settled[vertex] = 1
+            order.append(vertex)
+            if remaining is not None:
+                remaining.discard(vertex)
+                if not remaining:
+                    break
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[k]
+                new_distance = vertex_distance + weights[k]
+                if new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    parent[neighbor] = vertex
+                    heappush(heap, (new_distance, neighbor))
+
+        ids = self.ids
+        vertex_to_distance = {}
+        vertex_to_parent = {}
+        for i in order:
+            vertex_to_distance[ids[i]] = distance[i]
+            vertex_to_parent[ids[i]] = ids[parent[i]] if i != start else None
+        return vertex_to_distance, vertex_to_parent
+
+    def _bfs_tree(self, start, remaining=None):
+        """
+        Return the breadth-first shortest path tree from the vertex with
+        index `start`, in the form of `shortest_path_tree`, with distances
+        counted in edges. Stops once every index in `remaining` is reached.
+        """
+        ids, offsets, targets = self.ids, self.offsets, self.targets
+
+        vertex_to_distance = {ids[start]: 0}
+        vertex_to_parent = {ids[start]: None}
+        depth = array('q', [-1]) * len(ids)
+        depth[start] = 0
+        queue = deque([start])
+        if remaining is not None:
+            remaining.discard(start)
+            if not remaining:
+                queue.clear()
+
+        while queue:
+            vertex = queue.popleft()
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if depth[neighbor] == -1:
+                    depth[neighbor] = depth[vertex] + 1
+                    queue.append(neighbor)
+                    vertex_to_distance[ids[neighbor]] = depth[neighbor]
+                    vertex_to_parent[ids[neighbor]] = ids[vertex]
+                    if remaining is not None:
+                        remaining.discard(neighbor)
+                        if not remaining:
+                            return vertex_to_distance, vertex_to_parent
+        return vertex_to_distance, vertex_to_parent
+
+    def find_vertices_n_away(self, start_id, target_distance):
+        """
+        Find and return all vertices n distance away.
+
+        Arguments:
+        start_id (string): The id of the start vertex.
+        target_distance (integer): The distance from the start vertex we are looking for
+
+        Returns:
+        list<string>: All vertex ids that are `target_distance` away from the start vertex
+        """
+        start = self._start_index(start_id)
+        if target_distance < 0:
+            return []
+        offsets, targets = self.offsets, self.targets
+
+        seen = bytearray(len(self.ids))
+        seen[start] = 1
+        frontier = [start]
+
+        # Expand one whole level at a time, stopping at the target distance.
+        for _ in range(target_distance):
+            next_frontier = []
+            for vertex in frontier:
+                for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        return [self.ids[i] for i in frontier]
+
+    def find_vertices_n_away_batch(self, start_ids, target_distances):
+        """
+        Find the vertices at one or more distances from many start vertices
+        in a single level-synchronous BFS (see `multi_source_bfs`).
+
+        Arguments:
+        start_ids (iterable<string>): The ids of the start vertices.
+        target_distances (integer or iterable<integer>): The distance(s) from
+            the start vertices we are looking for
+
+        Returns:
+        dict<string, dict<integer, list<string>>>: For each start vertex, a
+        dictionary mapping each target distance to the vertex ids at exactly
+        that distance.
+        """
+        starts = [self._start_index(start_id) for start_id in start_ids]
+        levels = multi_source_bfs(starts, target_distances, self._neighbor_indices)
+        ids = self.ids
+        return {ids[start]: {distance: [ids[i] for i in vertices]
+            for distance, vertices in start_levels.items()}
+            for start, start_levels in levels.items()}
+
+    def find_connected_components(self):
+        """
+        Return a list of all connected components, with each connected component
+        represented as a list of vertex ids.
+
+        Directed graphs are split into weakly connected components.
+        """
+        ids = self.ids
+        graphs = [self] if not self.is_directed else [self, self.reverse()]
+
+        seen = bytearray(len(ids))
+        components = []
+        for start in range(len(ids)):
+            if seen[start]:
+                continue
+            seen[start] = 1
+            component = [start]
+            stack = [start]
+            while stack:
+                vertex = stack.pop()
+                for graph in graphs:
+                    offsets, targets = graph.offsets, graph.targets
+                    for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                        if not seen[neighbor]:
+                            seen[neighbor] = 1
+                            component.append(neighbor)
+                            stack.append(neighbor)
+            components.append([ids[i] for i in component])
+
+        return components
+
+    def topological_sort(self):
+        """
+        Return a valid ordering of vertices in a directed acyclic graph.
+        If the graph contains a cycle, raise a ValueError.
+        """
+        n = len(self.ids)
+        offsets, targets = self.offsets, self.targets
+
+        in_degree = array('q', bytes(8 * n))
+        for j in targets:
+            in_degree[j] += 1
+
+        queue = deque(i for i in range(n) if in_degree[i] == 0)
+        order = []
+        while queue:
+            vertex = queue.popleft()
+            order.append(vertex)
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    queue.append(neighbor)
+
+        if len(order) != n:
+            raise ValueError('Graph contains cycle and cannot be sorted.')
+        return [self.ids[i] for i in order]
+
+
+def multi_source_bfs(starts, target_distances, get_neighbors, stats=None):
+    """
+    Find the vertices at one or more distances from many start vertices in a
+    single level-synchronous BFS. Shared by Graph and CSRGraph, which differ
+    only in how vertices and their neighbors are looked up.
+
+    Each start vertex is given one bit, and every vertex keeps the set of
+    starts that have reached it as a bitset. A whole frontier is expanded
+    per level, so a vertex reached by many starts at the same level is only
+    expanded once for all of them.
+
+    Parameters:
+    starts (iterable): The start vertices, which must be in the graph.
+    target_distances (integer or iterable<integer>): The distance(s) from
+        the start vertices we are looking for.
+    get_neighbors (function): Returns the neighbors of a vertex.
+    stats (QueryStats): Optional counters to update while searching.
+
+    Returns:
+    dict: For each start vertex, a dictionary mapping each target distance
+    to the list of vertices at exactly that distance.
+    """
+    if isinstance(target_distances, int):
+        target_distances = [target_distances]
+    target_distances = set(target_distances)
+    if any(distance < 0 for distance in target_distances):
+        raise ValueError("Distances must not be negative.")
+
+    starts = list(dict.fromkeys(starts))
+    results = {start: {distance: [] for distance in target_distances}
+        for start in starts}
+    frontier = {start: 1 << bit for bit, start in enumerate(starts)}
+    seen = dict(frontier)
+    max_distance = max(target_distances, default=-1)
+
+    distance = 0
+    while frontier:
+        if stats is not None:
+            stats.observe_frontier(len(frontier))
+        if distance in target_distances:
+            for vertex, reached_by in frontier.items():
+                # Hand the vertex to every start whose bit is set.
+                while reached_by:
+                    lowest_bit = reached_by & -reached_by
+                    start = starts[lowest_bit.bit_length() - 1]
+                    results[start][distance].append(vertex)
+                    reached_by ^= lowest_bit
+        if distance >= max_distance:
+            break
+
+        next_frontier = {}
+        for vertex, reached_by in frontier.items():
+            neighbors = get_neighbors(vertex)
+            if stats is not None:
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(neighbors)
+            for neighbor in neighbors:
+                new_starts = reached_by & ~seen.get(neighbor, 0)
+                if new_starts:
+                    seen[neighbor] = seen.get(neighbor, 0) | new_starts
+                    next_frontier[neighbor] = next_frontier.get(neighbor, 0) | new_starts
+        frontier = next_frontier
+        distance += 1
+
+    return results
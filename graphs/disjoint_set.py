@@ -0,0 +1,87 @@
+class DisjointSet:
+    """ DisjointSet Class
+    Represents a collection of disjoint sets (union-find) over hashable items.
+
+    `find` compresses paths iteratively and `union` joins by rank, so any
+    sequence of operations runs in near-constant amortized time per operation
+    without recursion.
+    """
+    def __init__(self, items=()):
+        """
+        Initialize the structure with each of `items` in its own set.
+
+        Parameters:
+        items (iterable): The initial items.
+        """
+        self.parent_map = {} # item -> parent item
+        self.rank_map = {} # root item -> rank
+        self.size_map = {} # root item -> number of items in its set
+        self.num_sets = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Add `item` in a set of its own. Does nothing if it is already present.
+
+        Returns:
+        boolean: True if the item was added.
+        """
+        if item in self.parent_map:
+            return False
+        self.parent_map[item] = item
+        self.rank_map[item] = 0
+        self.size_map[item] = 1
+        self.num_sets += 1
+        return True
+
+    def find(self, item):
+        """Get the root (or, group label) for `item`."""
+        parent_map = self.parent_map
+        root = item
+        while parent_map[root] != root:
+            root = parent_map[root]
+
+        # Point every item on the path straight at the root.
+        while parent_map[item] != root:
+            parent_map[item], item = root, parent_map[item]
+        return root
+
+    def union(self, item1, item2):
+        """
+        Combine the sets containing `item1` and `item2`.
+
+        Returns:
+        boolean: True if the items were in different sets.
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return False
+
+        # Attach the shorter tree under the taller one.
+        if self.rank_map[root1] < self.rank_map[root2]:
+            root1, root2 = root2, root1
+        self.parent_map[root2] = root1
+        if self.rank_map[root1] == self.rank_map[root2]:
+            self.rank_map[root1] += 1
+        self.size_map[root1] += self.size_map.pop(root2)
+        del self.rank_map[root2]
+        self.num_sets -= 1
+        return True
+
+    def connected(self, item1, item2):
+        """Return True if `item1` and `item2` are in the same set."""
+        return self.find(item1) == self.find(item2)
+
+    def set_size(self, item):
+        """Return the number of items in the set containing `item`."""
+        return self.size_map[self.find(item)]
+
+    def __contains__(self, item):
+        """Return True if `item` has been added."""
+        return item in self.parent_map
+
+    def __len__(self):
+        """Return the number of items."""
+        return len(self.parent_map)
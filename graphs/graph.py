@@ -1,19 +1,44 @@
 from collections import deque
 
+from graphs import all_pairs
+from graphs.connectivity import ComponentTrackingMixin
+from graphs.csr_graph import CSRGraph, multi_source_bfs
+from graphs.instrumentation import InstrumentationMixin, instrumented
+from graphs.query_cache import QueryCacheMixin, cached_query
+from graphs.topological_order import OnlineTopologicalOrder
 
-class Graph:
+
+class Graph(QueryCacheMixin, ComponentTrackingMixin, InstrumentationMixin):
     """ Graph Class
     Represents a directed or undirected graph.
     """
-    def __init__(self, is_directed=True):
+    ADJACENCY_TYPES = {'list': list, 'dict': dict}
+
+    def __init__(self, is_directed=True, adjacency='list'):
         """
         Initialize a graph object with an empty vertex dictionary.
 
         Parameters:
         is_directed (boolean): Whether the graph is directed (edges go in only one direction).
+        adjacency (string): How neighbor ids are stored. 'list' keeps every
+            edge added, duplicates included. 'dict' keeps them as the keys of
+            an insertion-ordered dict, so duplicate edges are ignored and
+            `contains_edge` and `remove_edge` take O(1) rather than O(deg).
         """
-        self.vertex_dict = {} # id -> list of neighbor ids
+        if adjacency not in self.ADJACENCY_TYPES:
+            raise ValueError(f'Unknown adjacency type: {adjacency}')
+        self.vertex_dict = {} # id -> list (or dict) of neighbor ids
+        self.reverse_dict = {} # id -> list (or dict) of ids with an edge into it
         self.is_directed = is_directed
+        self.adjacency = adjacency
+        self.neighbor_type = self.ADJACENCY_TYPES[adjacency]
+        self.version = 0 # bumped on every change, to invalidate cached queries
+        self.query_cache = None
+        self.components = None # DisjointSet, while tracking components
+        self.components_stale = False
+        self.topological_order = None # OnlineTopologicalOrder, while maintained
+        self.instrumentation = None # Instrumentation, while enabled
+        self.active_stats = None # CallStats of the instrumented call running
 
     def add_vertex(self, vertex_id):
         """
@@ -22,7 +47,49 @@ class Graph:
         Parameters:
         vertex_id (string): The unique identifier for the new vertex.
         """
-        self.vertex_dict[vertex_id] = []
+        if vertex_id in self.vertex_dict:
+            # Re-adding a vertex clears its outgoing edges, so drop them from
+            # the reverse index as well.
+            for end_id in self.vertex_dict[vertex_id]:
+                self._unlink(self.reverse_dict[end_id], vertex_id)
+            if self.components is not None and self.vertex_dict[vertex_id]:
+                self.components_stale = True
+        else:
+            self.reverse_dict[vertex_id] = self.neighbor_type()
+            if self.components is not None:
+                self.components.add(vertex_id)
+            if self.topological_order is not None:
+                self.topological_order.add_vertex(vertex_id)
+        self.vertex_dict[vertex_id] = self.neighbor_type()
+        self.version += 1
+
+    def add_vertices_from(self, vertex_ids):
+        """
+        Add every vertex in `vertex_ids` that is not already in the graph.
+
+        Unlike `add_vertex`, a vertex that is already in the graph keeps its
+        edges, and cached queries are invalidated once for the whole batch.
+
+        Parameters:
+        vertex_ids (iterable<string>): The ids of the vertices to add.
+
+        Returns:
+        integer: The number of vertices added.
+        """
+        added = 0
+        for vertex_id in vertex_ids:
+            if vertex_id in self.vertex_dict:
+                continue
+            self.vertex_dict[vertex_id] = self.neighbor_type()
+            self.reverse_dict[vertex_id] = self.neighbor_type()
+            if self.components is not None:
+                self.components.add(vertex_id)
+            if self.topological_order is not None:
+                self.topological_order.add_vertex(vertex_id)
+            added += 1
+        if added:
+            self.version += 1
+        return added
 
     def add_edge(self, start_id, end_id):
         """
@@ -31,10 +98,149 @@ class Graph:
         Parameters:
         start_id (string): The unique identifier of the first vertex.
         end_id (string): The unique identifier of the second vertex.
+
+        Raises:
+        KeyError: If either vertex is not in the graph. The edge is not added.
+        ValueError: If a topological order is being maintained and the edge
+        would create a cycle. The edge is not added.
         """
-        self.vertex_dict[start_id].append(end_id)
-        # if not self.is_directed:
-        #     self.vertex_dict[end_id].append(start_id)
+        if start_id not in self.vertex_dict:
+            raise KeyError("The start vertex is not in the graph!")
+        if end_id not in self.vertex_dict:
+            raise KeyError("The end vertex is not in the graph!")
+        if self.adjacency == 'dict' and self.contains_edge(start_id, end_id):
+            return
+        if self.topological_order is not None:
+            self.topological_order.insert_edge(start_id, end_id)
+        self._link(start_id, end_id)
+        self.version += 1
+        if self.components is not None:
+            self.components.union(start_id, end_id)
+
+    def add_edges_from(self, edges):
+        """
+        Add every edge in `edges` that is not already in the graph.
+
+        Duplicates, whether repeated in `edges` or already stored, are skipped;
+        in an undirected graph (A, B) and (B, A) are the same edge. Unless a
+        topological order is being maintained, which has to check each edge
+        for a cycle, the edges are stored without going through `add_edge`
+        and cached queries are invalidated once for the whole batch.
+
+        Parameters:
+        edges (iterable<tuple>): (start_id, end_id) pairs. Both vertices of
+            each edge must already be in the graph.
+
+        Returns:
+        integer: The number of edges added.
+        """
+        if self.topological_order is not None:
+            added = 0
+            for start_id, end_id in edges:
+                if not self.contains_edge(start_id, end_id):
+                    self.add_edge(start_id, end_id)
+                    added += 1
+            return added
+
+        vertex_dict = self.vertex_dict
+        if self.adjacency == 'dict':
+            neighbors_of = vertex_dict.__getitem__
+        else:
+            # Sets of the stored neighbors, built for the vertices this batch
+            # touches, so duplicates are found without scanning the lists.
+            neighbor_sets = {}
+            def neighbors_of(vertex_id):
+                neighbors = neighbor_sets.get(vertex_id)
+                if neighbors is None:
+                    neighbors = neighbor_sets[vertex_id] = set(vertex_dict[vertex_id])
+                return neighbors
+
+        added = 0
+        try:
+            for start_id, end_id in edges:
+                if start_id not in vertex_dict:
+                    raise KeyError("The start vertex is not in the graph!")
+                if end_id not in vertex_dict:
+                    raise KeyError("The end vertex is not in the graph!")
+                neighbors = neighbors_of(start_id)
+                if end_id in neighbors or (not self.is_directed
+                        and start_id in neighbors_of(end_id)):
+                    continue
+                if self.adjacency == 'list':
+                    neighbors.add(end_id)
+                self._link(start_id, end_id)
+                if self.components is not None:
+                    self.components.union(start_id, end_id)
+                added += 1
+        finally:
+            if added:
+                self.version += 1
+        return added
+
+    def remove_edge(self, start_id, end_id):
+        """
+        Remove the edge from vertex `start_id` to vertex `end_id`. In an
+        undirected graph the edge may have been added in either direction.
+        With list adjacency only one copy of a duplicated edge is removed.
+
+        Parameters:
+        start_id (string): The unique identifier of the first vertex.
+        end_id (string): The unique identifier of the second vertex.
+
+        Raises:
+        KeyError: If the edge is not in the graph.
+        """
+        if end_id not in self.vertex_dict[start_id]:
+            if self.is_directed or start_id not in self.vertex_dict[end_id]:
+                raise KeyError("The edge is not in the graph!")
+            start_id, end_id = end_id, start_id
+        self._unlink(self.vertex_dict[start_id], end_id)
+        self._unlink(self.reverse_dict[end_id], start_id)
+        self.version += 1
+        if self.components is not None:
+            self.components_stale = True
+
+    def _link(self, start_id, end_id):
+        """Store the edge from `start_id` to `end_id` in both indexes."""
+        if self.adjacency == 'dict':
+            self.vertex_dict[start_id][end_id] = None
+            self.reverse_dict[end_id][start_id] = None
+        else:
+            self.vertex_dict[start_id].append(end_id)
+            self.reverse_dict[end_id].append(start_id)
+
+    def _unlink(self, neighbors, vertex_id):
+        """Remove one occurrence of `vertex_id` from a neighbor list or dict."""
+        if self.adjacency == 'dict':
+            del neighbors[vertex_id]
+        else:
+            neighbors.remove(vertex_id)
+
+    def enable_topological_order(self):
+        """
+        Start maintaining a topological order of this directed acyclic graph
+        as edges are added. From then on, `add_edge` rejects any edge that
+        would create a cycle.
+
+        Raises:
+        ValueError: If the graph is undirected or already contains a cycle.
+        """
+        self.topological_order = OnlineTopologicalOrder(self)
+
+    def disable_topological_order(self):
+        """Stop maintaining a topological order."""
+        self.topological_order = None
+
+    def get_topological_order(self):
+        """
+        Return the maintained topological order.
+
+        Returns:
+        list<string>: The vertex ids, each before every vertex it points to.
+        """
+        if self.topological_order is None:
+            raise ValueError('Topological order is not being maintained.')
+        return self.topological_order.get_order()
 
     def contains_vertex(self, vertex_id):
         """Return True if the vertex is contained in the graph."""
@@ -45,10 +251,15 @@ class Graph:
         Return True if the edge is contained in the graph from vertex `start_id`
         to vertex `end_id`.
 
+        In an undirected graph the edge may have been added in either
+        direction. This is O(1) with dict adjacency and O(deg) with lists.
+
         Parameters:
         start_id (string): The unique identifier of the first vertex.
         end_id (string): The unique identifier of the second vertex."""
-        return end_id in self.vertex_dict[start_id]
+        if end_id in self.vertex_dict[start_id]:
+            return True
+        return not self.is_directed and start_id in self.vertex_dict[end_id]
 
     def get_vertices(self):
         """
@@ -59,26 +270,60 @@ class Graph:
         """
         return list(self.vertex_dict.keys())
 
+    def _edge_ids(self):
+        """Iterate over every stored edge as a (start_id, end_id) tuple."""
+        for start_id, neighbors in self.vertex_dict.items():
+            for end_id in neighbors:
+                yield start_id, end_id
+
     def get_neighbors(self, start_id):
         """
         Return a list of neighbors to the vertex `start_id`.
 
+        For undirected graphs the reverse index is used to find the vertices
+        with an edge into `start_id`, so the lookup costs O(deg) rather than a
+        scan over every vertex.
+
         Returns:
         list<string>: The neigbors of the start vertex.
         """
+        if self.adjacency == 'dict':
+            if self.is_directed:
+                return list(self.vertex_dict[start_id])
+            return [*self.reverse_dict[start_id], *self.vertex_dict[start_id]]
+
         if self.is_directed:
             return self.vertex_dict[start_id]
 
-        neighbors = []
-        for vertex in self.vertex_dict:
-            if start_id in self.vertex_dict[vertex]:
-                neighbors.append(vertex)
-        neighbors.extend(self.vertex_dict[start_id])
-        return neighbors
+        return self.reverse_dict[start_id] + self.vertex_dict[start_id]
+
+    def get_incoming_neighbors(self, end_id):
+        """
+        Return a list of vertices with an edge into the vertex `end_id`.
+
+        Returns:
+        list<string>: The ids of the vertices pointing at the end vertex.
+        """
+        if self.adjacency == 'dict':
+            return list(self.reverse_dict[end_id])
+        return self.reverse_dict[end_id]
+
+    def freeze(self):
+        """
+        Return a compact, read-only copy of the graph.
+
+        Vertex ids are interned to integers and the adjacency is stored as CSR
+        offset/target arrays, which costs a few bytes per edge rather than a
+        Python list entry per neighbor.
+
+        Returns:
+        CSRGraph: The frozen graph.
+        """
+        return CSRGraph.from_graph(self)
 
     def __str__(self):
         """Return a string representation of the graph."""
-        graph_repr = [f'{vertex} -> {self.vertex_dict[vertex]}' 
+        graph_repr = [f'{vertex} -> {list(self.vertex_dict[vertex])}' 
             for vertex in self.vertex_dict.keys()]
         return f'Graph with vertices: \n' +'\n'.join(graph_repr)
 
@@ -90,64 +335,259 @@ class Graph:
         """
         Example of traversing the graph using breadth-first search.
         """
+        for vertex_id in self.iter_bfs(start_id):
+            # Process current node
+            print('Processing vertex {}'.format(vertex_id))
+
+    def iter_bfs(self, start_id, max_depth=None, with_info=False):
+        """
+        Lazily traverse the graph using breadth-first search.
+
+        Vertices are discovered only as the caller asks for them, so stopping
+        early skips the rest of the search.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        max_depth (integer): If given, do not go further than this many edges
+            from the start vertex.
+        with_info (boolean): Whether to yield (id, depth, parent id) tuples
+            instead of ids. The parent of the start vertex is None.
+
+        Returns:
+        generator: The vertex ids (or tuples), in BFS order.
+        """
         if start_id not in self.vertex_dict:
             raise KeyError("The start vertex is not in the graph!")
+        return self._iter_bfs(start_id, max_depth, with_info)
+
+    def _iter_bfs(self, start_id, max_depth, with_info):
+        """Generator behind `iter_bfs`."""
+        # The stats cover the life of the generator, including the time the
+        # caller spends between vertices.
+        instrumentation = self.instrumentation
+        stats = instrumentation.start('iter_bfs') if instrumentation else None
 
         # Keep a set to denote which vertices we've seen before
         seen = set()
         seen.add(start_id)
 
-        # Keep a queue so that we visit vertices in the appropriate order
+        # Keep a queue of (id, depth, parent) so that we visit vertices in the
+        # appropriate order
         queue = deque()
-        queue.append(start_id)
+        queue.append((start_id, 0, None))
 
-        while queue:
-            current_vertex_id = queue.popleft()
+        try:
+            while queue:
+                if stats is not None:
+                    stats.observe_frontier(len(queue))
+                    stats.vertices_dequeued += 1
+                current_vertex_id, depth, parent_id = queue.popleft()
+                yield (current_vertex_id, depth, parent_id) if with_info \
+                    else current_vertex_id
 
-            # Process current node
-            print('Processing vertex {}'.format(current_vertex_id))
+                if max_depth is not None and depth >= max_depth:
+                    continue
 
-            # Add its neighbors to the queue
-            for neighbor_id in self.get_neighbors(current_vertex_id):
-                if neighbor_id not in seen:
-                    seen.add(neighbor_id)
-                    queue.append(neighbor_id)
+                # Add its neighbors to the queue
+                neighbors = self.get_neighbors(current_vertex_id)
+                if stats is not None:
+                    stats.edges_scanned += len(neighbors)
+                for neighbor_id in neighbors:
+                    if neighbor_id not in seen:
+                        seen.add(neighbor_id)
+                        queue.append((neighbor_id, depth + 1, current_vertex_id))
+        finally:
+            if stats is not None:
+                instrumentation.finish(stats)
+
+    def iter_dfs(self, start_id, max_depth=None, with_info=False):
+        """
+        Lazily traverse the graph using depth-first search, yielding each
+        vertex the first time it is visited (pre-order).
 
-        return # everything has been processed
+        An explicit stack of neighbor iterators is used instead of recursion,
+        so arbitrarily deep graphs can be traversed.
 
-    def find_shortest_path(self, start_id, target_id):
+        Parameters:
+        start_id (string): The id of the start vertex.
+        max_depth (integer): If given, do not go further than this many edges
+            from the start vertex.
+        with_info (boolean): Whether to yield (id, depth, parent id) tuples
+            instead of ids. The parent of the start vertex is None.
+
+        Returns:
+        generator: The vertex ids (or tuples), in DFS order.
+        """
+        if start_id not in self.vertex_dict:
+            raise KeyError("The start vertex is not in the graph!")
+        return self._iter_dfs(start_id, max_depth, with_info)
+
+    def _iter_dfs(self, start_id, max_depth, with_info):
+        """Generator behind `iter_dfs`."""
+        # The stats cover the life of the generator, including the time the
+        # caller spends between vertices.
+        instrumentation = self.instrumentation
+        stats = instrumentation.start('iter_dfs') if instrumentation else None
+
+        visited = set() # set of vertices we've visited so far
+        visited.add(start_id)
+
+        try:
+            yield (start_id, 0, None) if with_info else start_id
+            if max_depth == 0:
+                return
+
+            # Each frame is a vertex and the iterator over its remaining neighbors
+            neighbors = self.get_neighbors(start_id)
+            if stats is not None:
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(neighbors)
+            stack = [(start_id, iter(neighbors))]
+
+            while stack:
+                vertex, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        depth = len(stack)
+                        yield (neighbor, depth, vertex) if with_info else neighbor
+                        if max_depth is None or depth < max_depth:
+                            next_neighbors = self.get_neighbors(neighbor)
+                            stack.append((neighbor, iter(next_neighbors)))
+                            if stats is not None:
+                                stats.vertices_dequeued += 1
+                                stats.edges_scanned += len(next_neighbors)
+                                stats.observe_frontier(len(stack))
+                            break
+                else:
+                    stack.pop()
+        finally:
+            if stats is not None:
+                instrumentation.finish(stats)
+
+    @cached_query
+    @instrumented
+    def find_shortest_path(self, start_id, target_id, bidirectional=False):
         """
         Find and return the shortest path from start_id to target_id.
 
+        Only a parent pointer is stored per discovered vertex, and the path is
+        rebuilt once at the end.
+
         Parameters:
         start_id (string): The id of the start vertex.
         target_id (string): The id of the target (end) vertex.
+        bidirectional (boolean): Whether to search from both ends at once,
+            meeting in the middle. This expands far fewer vertices on large
+            graphs with a high branching factor.
 
         Returns:
-        list<string>: A list of all vertex ids in the shortest path, from start to end.
+        list<string>: A list of all vertex ids in the shortest path, from start
+        to end, or None if the target cannot be reached.
         """
         if start_id not in self.vertex_dict:
             raise KeyError("The start vertex is not in the graph!")
+        if target_id not in self.vertex_dict:
+            raise KeyError("The target vertex is not in the graph!")
 
-        path_dict = {start_id: [start_id]}
+        if bidirectional:
+            return self._find_shortest_path_bidirectional(start_id, target_id)
+
+        stats = self.active_stats
+        parents = {start_id: None}
         queue = deque()
         queue.append(start_id)
 
         while len(queue) > 0:
+            if stats is not None:
+                stats.observe_frontier(len(queue))
+                stats.vertices_dequeued += 1
             vertex = queue.popleft()
 
             if vertex == target_id:
                 break
-            
-            for neighor_id in self.get_neighbors(vertex):
-                if neighor_id not in path_dict:
-                    path_dict[neighor_id] = list(path_dict[vertex])
-                    path_dict[neighor_id].append(neighor_id)
-                    queue.append(neighor_id)
 
-        return path_dict[target_id]
+            neighbors = self.get_neighbors(vertex)
+            if stats is not None:
+                stats.edges_scanned += len(neighbors)
+            for neighbor_id in neighbors:
+                if neighbor_id not in parents:
+                    parents[neighbor_id] = vertex
+                    queue.append(neighbor_id)
 
+        if target_id not in parents:
+            return None
+        path = self._follow_parents(parents, target_id)
+        path.reverse()
+        return path
 
+    def _find_shortest_path_bidirectional(self, start_id, target_id):
+        """
+        Find the shortest path with a BFS from each end, always expanding one
+        whole level of the smaller frontier, until the two searches meet.
+        """
+        if start_id == target_id:
+            return [start_id]
+
+        stats = self.active_stats
+        get_incoming = self.get_incoming_neighbors if self.is_directed \
+            else self.get_neighbors
+        forward_parents = {start_id: None}
+        backward_parents = {target_id: None}
+        forward_frontier = [start_id]
+        backward_frontier = [target_id]
+
+        meeting_id = None
+        while forward_frontier and backward_frontier and meeting_id is None:
+            # Because whole levels are expanded and we stop at the first
+            # meeting, the first vertex seen by both searches is on a
+            # shortest path.
+            if len(forward_frontier) <= len(backward_frontier):
+                parents, other_parents = forward_parents, backward_parents
+                frontier, get_next = forward_frontier, self.get_neighbors
+            else:
+                parents, other_parents = backward_parents, forward_parents
+                frontier, get_next = backward_frontier, get_incoming
+
+            if stats is not None:
+                stats.observe_frontier(len(forward_frontier) + len(backward_frontier))
+            next_frontier = []
+            for vertex in frontier:
+                neighbors = get_next(vertex)
+                if stats is not None:
+                    stats.vertices_dequeued += 1
+                    stats.edges_scanned += len(neighbors)
+                for neighbor_id in neighbors:
+                    if neighbor_id not in parents:
+                        parents[neighbor_id] = vertex
+                        next_frontier.append(neighbor_id)
+                        if neighbor_id in other_parents:
+                            meeting_id = neighbor_id
+                            break
+                if meeting_id is not None:
+                    break
+
+            if parents is forward_parents:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        if meeting_id is None:
+            return None
+        path = self._follow_parents(forward_parents, meeting_id)
+        path.reverse()
+        path.extend(self._follow_parents(backward_parents, meeting_id)[1:])
+        return path
+
+    def _follow_parents(self, parents, vertex_id):
+        """Return the ids from `vertex_id` back to the root of `parents`."""
+        path = [vertex_id]
+        while parents[path[-1]] is not None:
+            path.append(parents[path[-1]])
+        return path
+
+    @cached_query
+    @instrumented
     def find_vertices_n_away(self, start_id, target_distance):
         """
         Find and return all vertices n distance away.
@@ -162,11 +602,15 @@ class Graph:
         if start_id not in self.vertex_dict:
             raise KeyError("The start vertex is not in the graph!")
 
+        stats = self.active_stats
         target_vertcies = []
         distance = {start_id: 0}
         queue = deque([start_id])
 
         while len(queue) > 0:
+            if stats is not None:
+                stats.observe_frontier(len(queue))
+                stats.vertices_dequeued += 1
             vertex = queue.popleft()
 
             # Process Vertext
@@ -175,13 +619,64 @@ class Graph:
             elif distance[vertex] > target_distance:
                 break
 
-            for neighbor in self.get_neighbors(vertex):
+            neighbors = self.get_neighbors(vertex)
+            if stats is not None:
+                stats.edges_scanned += len(neighbors)
+            for neighbor in neighbors:
                 if neighbor not in distance:
                     distance[neighbor] = distance[vertex] + 1
                     queue.append(neighbor)
 
         return target_vertcies
 
+    @instrumented
+    def find_vertices_n_away_batch(self, start_ids, target_distances):
+        """
+        Find the vertices at one or more distances from many start vertices
+        in a single level-synchronous BFS (see `multi_source_bfs`).
+
+        Arguments:
+        start_ids (iterable<string>): The ids of the start vertices.
+        target_distances (integer or iterable<integer>): The distance(s) from
+            the start vertices we are looking for
+
+        Returns:
+        dict<string, dict<integer, list<string>>>: For each start vertex, a
+        dictionary mapping each target distance to the vertex ids at exactly
+        that distance.
+        """
+        start_ids = list(start_ids)
+        for start_id in start_ids:
+            if start_id not in self.vertex_dict:
+                raise KeyError("The start vertex is not in the graph!")
+        return multi_source_bfs(start_ids, target_distances, self.get_neighbors,
+            self.active_stats)
+
+    def all_pairs_bfs(self, sources=None, max_workers=None):
+        """
+        Find the distance from each source vertex to every vertex, using a
+        pool of worker processes that share one frozen copy of the graph.
+
+        Parameters:
+        sources (iterable<string>): The ids of the source vertices; defaults
+            to every vertex.
+        max_workers (integer): The number of worker processes; defaults to the
+            number of CPUs.
+
+        Returns:
+        generator: (source id, distances) pairs, where `distances` is an array
+        indexed like `get_vertices()` with -1 for unreachable vertices.
+        """
+        return all_pairs.all_pairs_bfs(self, sources, max_workers)
+
+    def distance_matrix(self, max_workers=None):
+        """
+        Return the all-pairs distance matrix and a dictionary mapping each
+        vertex id to its row and column index.
+        """
+        return all_pairs.distance_matrix(self, max_workers)
+
+    @instrumented
     def is_bipartite(self):
         """
         Return True if the graph is bipartite, and False otherwise.
@@ -195,11 +690,18 @@ class Graph:
         queue = deque()
         queue.append(start_id)
 
+        stats = self.active_stats
         while queue:
+            if stats is not None:
+                stats.observe_frontier(len(queue))
+                stats.vertices_dequeued += 1
             vertex = queue.popleft()
 
             # Add its neighbors to the queue
-            for neighbor in self.get_neighbors(vertex):
+            neighbors = self.get_neighbors(vertex)
+            if stats is not None:
+                stats.edges_scanned += len(neighbors)
+            for neighbor in neighbors:
                 if neighbor not in vertex_colors:
                     vertex_colors[neighbor] = not vertex_colors[vertex]
                     queue.append(neighbor)
@@ -208,62 +710,131 @@ class Graph:
 
         return True
 
+    @instrumented
     def find_connected_components(self):
         """
         Return a list of all connected components, with each connected component
         represented as a list of vertex ids.
+
+        Edges are followed in both directions, so a directed graph is split into
+        its weakly connected components. Runs in O(V+E).
         """
+        stats = self.active_stats
         components = []
-        not_visited = list(self.vertex_dict.keys())
-        
-        while not_visited:
-            start_id = not_visited.pop()
-            
-            # Keep a set to denote which vertices we've seen before
-            seen = set()
+
+        # Keep a set to denote which vertices we've seen before, across all
+        # components
+        seen = set()
+
+        for start_id in self.vertex_dict:
+            if start_id in seen:
+                continue
             seen.add(start_id)
+            component = [start_id]
 
             # Keep a queue so that we visit vertices in the appropriate order
             queue = deque()
             queue.append(start_id)
 
             while queue:
+                if stats is not None:
+                    stats.observe_frontier(len(queue))
+                    stats.vertices_dequeued += 1
+                    stats.edges_scanned += len(self.vertex_dict[queue[0]]) + \
+                        len(self.reverse_dict[queue[0]])
                 current_vertex_id = queue.popleft()
 
-                # Add its neighbors to the queue
-                for neighbor_id in self.get_neighbors(current_vertex_id):
-                    if neighbor_id not in seen:
-                        seen.add(neighbor_id)
-                        not_visited.remove(neighbor_id)
-                        queue.append(neighbor_id)
-            components.append(list(seen))
-            
+                # Add its neighbors (in either direction) to the queue
+                for neighbors in (self.vertex_dict[current_vertex_id],
+                        self.reverse_dict[current_vertex_id]):
+                    for neighbor_id in neighbors:
+                        if neighbor_id not in seen:
+                            seen.add(neighbor_id)
+                            component.append(neighbor_id)
+                            queue.append(neighbor_id)
+            components.append(component)
+
         return components
 
-    def dfs_traversal(self, start_id):
-        """Visit each vertex, starting with start_id, in DFS order."""
+    @instrumented
+    def find_strongly_connected_components(self):
+        """
+        Return a list of all strongly connected components, with each component
+        represented as a list of vertex ids.
 
-        visited = set() # set of vertices we've visited so far
+        Uses Tarjan's algorithm with an explicit stack instead of recursion, so
+        it runs in O(V+E) on graphs of any depth. Components are returned in
+        reverse topological order of the condensed graph.
+        """
+        stats = self.active_stats
+        vertex_index = {} # id -> order of discovery
+        low_link = {} # id -> lowest index reachable from its DFS subtree
+        on_stack = set()
+        stack = []
+        components = []
 
-        def dfs_traversal_recursive(start_vertex):
-            print(f'Visiting vertex {start_vertex.get_id()}')
+        for root_id in self.vertex_dict:
+            if root_id in vertex_index:
+                continue
+
+            vertex_index[root_id] = low_link[root_id] = len(vertex_index)
+            stack.append(root_id)
+            on_stack.add(root_id)
+            # Each frame is a vertex and the iterator over its unvisited neighbors
+            neighbors = self.get_neighbors(root_id)
+            if stats is not None:
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(neighbors)
+            work = [(root_id, iter(neighbors))]
+
+            while work:
+                vertex, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if neighbor not in vertex_index:
+                        vertex_index[neighbor] = low_link[neighbor] = len(vertex_index)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        next_neighbors = self.get_neighbors(neighbor)
+                        work.append((neighbor, iter(next_neighbors)))
+                        if stats is not None:
+                            stats.vertices_dequeued += 1
+                            stats.edges_scanned += len(next_neighbors)
+                            stats.observe_frontier(len(work))
+                        break
+                    elif neighbor in on_stack:
+                        low_link[vertex] = min(low_link[vertex], vertex_index[neighbor])
+                else:
+                    # All neighbors are done; return to the parent frame.
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[vertex])
+
+                    if low_link[vertex] == vertex_index[vertex]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            component.append(member)
+                            if member == vertex:
+                                break
+                        components.append(component)
 
-            # recurse for each vertex in neighbors
-            for neighbor in start_vertex.get_neighbors():
-                if neighbor.get_id() not in visited:
-                    visited.add(neighbor.get_id())
-                    dfs_traversal_recursive(neighbor)
-            return
+        return components
 
-        visited.add(start_id)
-        dfs_traversal_recursive(start_id)
+    def dfs_traversal(self, start_id):
+        """Visit each vertex, starting with start_id, in DFS order."""
+        for vertex_id in self.iter_dfs(start_id):
+            print(f'Visiting vertex {vertex_id}')
 
+    @instrumented
     def find_path_dfs_iter(self, start_id, target_id):
         """
         Use DFS with a stack to find a path from start_id to target_id.
         """
         if start_id not in self.vertex_dict:
             raise KeyError("The start vertex is not in the graph!")
+        stats = self.active_stats
 
         # Keep a set to denote which vertices we've seen before and the path up to them
         path_dict = {start_id: [start_id]}
@@ -273,13 +844,19 @@ class Graph:
         stack.append(start_id)
 
         while stack:
+            if stats is not None:
+                stats.observe_frontier(len(stack))
+                stats.vertices_dequeued += 1
             vertex = stack.pop()
 
             if vertex == target_id:
                 return path_dict[target_id]
 
             # Add its neighbors to the queue
-            for neighbor in self.get_neighbors(vertex):
+            neighbors = self.get_neighbors(vertex)
+            if stats is not None:
+                stats.edges_scanned += len(neighbors)
+            for neighbor in neighbors:
                 if neighbor not in path_dict:
                     path_dict[neighbor] = path_dict[vertex]
                     path_dict[neighbor].append(neighbor)
@@ -287,64 +864,104 @@ class Graph:
 
     def contains_cycle(self):
         """
-        Return True if the directed graph contains a cycle, False otherwise.
+        Return True if the graph contains a cycle, False otherwise.
         """
-        
-        not_visited = list(self.vertex_dict.keys())
-
-        while not_visited:
-            start_id = not_visited.pop()
-            current_path = set()
-            
-            def dfs_traversal_recursive(start_vertex):
-                contains_cycle = False
-
-                # recurse for each vertex in neighbors
-                for neighbor in self.get_neighbors(start_vertex):
-                    if neighbor in not_visited:
-                        not_visited.remove(neighbor) # This operation is O(n) where n is the vertices in the not_visited.
-                        # The above operation makes this algorith slower rather than using a set for visited and fillin it
-                        # but is better for space because its only creating one array rather than a set for the visted and
-                        # an array of arrays for the different connected components possible in the graph.
-                        current_path.add(neighbor)
-                        contains_cycle = dfs_traversal_recursive(neighbor)
-                    elif neighbor in current_path:
-                        return True
-                current_path.remove(start_vertex)
-                return contains_cycle
-
-            current_path.add(start_id)
-            return dfs_traversal_recursive(start_id)
-        
+        return self.find_cycle() is not None
 
-    def topological_sort(self):
-        """
-        Return a valid ordering of vertices in a directed acyclic graph.
-        If the graph contains a cycle, throw a ValueError.
+    @instrumented
+    def find_cycle(self):
         """
-        if self.contains_cycle():
-            return ValueError('Graph contains cycle and cannot be sorted.')
-        
-        # Create a stack to hold the vertex ordering.
-        stack = list()
-        
-        # For each unvisited vertex, execute a DFS from that vertex.
-        not_visited = list(self.vertex_dict.keys())
-
-        while not_visited:
-            start_id = not_visited.pop()
+        Return a cycle in the graph, or None if it is acyclic.
 
-            def dfs_traversal_recursive(start_vertex):
-                # recurse for each vertex in neighbors
-                for neighbor in self.get_neighbors(start_vertex):
-                    if neighbor in not_visited:
-                        not_visited.remove(neighbor)
-                        dfs_traversal_recursive(neighbor)
-                # On the way back up the recursion tree, add the vertex to the stack.
-                stack.append(start_vertex)
+        Uses an iterative three-color DFS (unvisited, on the current path,
+        finished) from every unvisited vertex, so it runs in O(V+E) without
+        recursion. In an undirected graph the edge back to the vertex we came
+        from is not a cycle, so it is skipped once.
 
-            dfs_traversal_recursive(start_id)
+        Returns:
+        list<string>: The vertex ids on the cycle, in edge order; the last
+        vertex has an edge back to the first.
+        """
+        stats = self.active_stats
+        on_path, finished = 1, 2
+        color = {} # id -> on_path or finished; unvisited vertices are absent
+        parent = {} # id -> the vertex we reached it from
+
+        for root_id in self.vertex_dict:
+            if root_id in color:
+                continue
+            color[root_id] = on_path
+            neighbors = self.get_neighbors(root_id)
+            if stats is not None:
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(neighbors)
+            # Each entry is [vertex, its unvisited neighbors, the parent edge
+            # still to skip (undirected graphs only)].
+            work = [[root_id, iter(neighbors), None]]
+
+            while work:
+                frame = work[-1]
+                vertex, neighbors = frame[0], frame[1]
+                for neighbor in neighbors:
+                    if neighbor == frame[2]:
+                        frame[2] = None
+                        continue
+                    neighbor_color = color.get(neighbor)
+                    if neighbor_color is None:
+                        color[neighbor] = on_path
+                        parent[neighbor] = vertex
+                        next_neighbors = self.get_neighbors(neighbor)
+                        work.append([neighbor, iter(next_neighbors),
+                            None if self.is_directed else vertex])
+                        if stats is not None:
+                            stats.vertices_dequeued += 1
+                            stats.edges_scanned += len(next_neighbors)
+                            stats.observe_frontier(len(work))
+                        break
+                    elif neighbor_color == on_path:
+                        # An edge back onto the current path closes a cycle.
+                        cycle = [vertex]
+                        while cycle[-1] != neighbor:
+                            cycle.append(parent[cycle[-1]])
+                        cycle.reverse()
+                        return cycle
+                else:
+                    color[vertex] = finished
+                    work.pop()
+
+        return None
+
+    @instrumented
+    def topological_sort(self):
+        """
+        Return a valid ordering of vertices in a directed acyclic graph.
+        If the graph is undirected or contains a cycle, raise a ValueError.
 
-        # Reverse the contents of the stack and return it as a valid ordering.
-        return list(reversed(stack))
+        Uses Kahn's algorithm: repeatedly output a vertex with no remaining
+        incoming edges, in O(V+E).
+        """
+        if not self.is_directed:
+            raise ValueError('Graph is undirected and cannot be sorted.')
+        in_degree = {vertex_id: len(self.reverse_dict[vertex_id])
+            for vertex_id in self.vertex_dict}
+        queue = deque(vertex_id for vertex_id, degree in in_degree.items()
+            if degree == 0)
+
+        stats = self.active_stats
+        ordering = []
+        while queue:
+            if stats is not None:
+                stats.observe_frontier(len(queue))
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(self.vertex_dict[queue[0]])
+            vertex = queue.popleft()
+            ordering.append(vertex)
+            for neighbor in self.vertex_dict[vertex]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    queue.append(neighbor)
 
+        if len(ordering) != len(self.vertex_dict):
+            cycle = self.find_cycle()
+            raise ValueError(f'Graph contains cycle and cannot be sorted: {cycle}')
+        return ordering
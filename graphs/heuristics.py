@@ -0,0 +1,61 @@
+from math import asin, cos, hypot, radians, sin, sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def euclidean(coordinates, scale=1):
+    """
+    Return an A* heuristic giving the straight-line distance between two
+    vertices on a plane.
+
+    The estimate never overestimates as long as every edge weight is at
+    least `scale` times the straight-line distance between its endpoints.
+
+    Parameters:
+    coordinates (dict): Maps each vertex id to an (x, y) tuple.
+    scale (number): Multiplies the distance, e.g. to convert it into the
+        unit of the edge weights.
+
+    Returns:
+    function: heuristic(vertex_id, target_id) -> number.
+    """
+    def heuristic(vertex_id, target_id):
+        x1, y1 = coordinates[vertex_id]
+        x2, y2 = coordinates[target_id]
+        return scale * hypot(x2 - x1, y2 - y1)
+    return heuristic
+
+
+def haversine(coordinates, radius=EARTH_RADIUS_KM):
+    """
+    Return an A* heuristic giving the great-circle distance between two
+    vertices on a sphere, such as the earth.
+
+    Parameters:
+    coordinates (dict): Maps each vertex id to a (latitude, longitude) tuple
+        in degrees.
+    radius (number): The radius of the sphere, in the unit of the edge
+        weights. Defaults to the mean radius of the earth in kilometres.
+
+    Returns:
+    function: heuristic(vertex_id, target_id) -> number.
+    """
+    def heuristic(vertex_id, target_id):
+        latitude1, longitude1 = map(radians, coordinates[vertex_id])
+        latitude2, longitude2 = map(radians, coordinates[target_id])
+        a = sin((latitude2 - latitude1) / 2) ** 2 + cos(latitude1) * \
+            cos(latitude2) * sin((longitude2 - longitude1) / 2) ** 2
+        return 2 * radius * asin(min(1.0, sqrt(a)))
+    return heuristic
+
+
+def zero(vertex_id, target_id):
+    """A heuristic that knows nothing, which turns A* into Dijkstra."""
+    return 0
+
+
+HEURISTICS = {
+    'euclidean': euclidean,
+    'haversine': haversine,
+}
@@ -0,0 +1,137 @@
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+
+COUNTERS = ('vertices_dequeued', 'edges_scanned', 'edges_relaxed',
+    'heap_pushes', 'peak_frontier')
+
+
+class CallStats:
+    """ CallStats Class
+    The wall time and work counters of one call to a graph algorithm.
+    """
+    __slots__ = ('name', 'seconds', 'start_time') + COUNTERS
+
+    def __init__(self, name):
+        """
+        Initialize zeroed counters for a call to the algorithm `name`.
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.start_time = perf_counter()
+        self.vertices_dequeued = 0 # vertices taken off a queue, stack or heap
+        self.edges_scanned = 0 # adjacency entries looked at
+        self.edges_relaxed = 0 # edges that improved a tentative distance
+        self.heap_pushes = 0
+        self.peak_frontier = 0 # largest queue, stack or heap seen
+
+    def observe_frontier(self, size):
+        """Record the current size of the queue, stack or heap."""
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def as_dict(self):
+        """Return the stats as a dictionary, e.g. for a metrics exporter."""
+        stats = {'name': self.name, 'seconds': self.seconds}
+        for counter in COUNTERS:
+            stats[counter] = getattr(self, counter)
+        return stats
+
+    def __repr__(self):
+        """Return a string representation of the stats."""
+        return f'CallStats({self.as_dict()})'
+
+
+class Instrumentation:
+    """ Instrumentation Class
+    Collects CallStats for the algorithm calls of one graph: the most recent
+    calls, running totals per algorithm, and an optional callback per call.
+    """
+    def __init__(self, callback=None, history=100):
+        """
+        Parameters:
+        callback (function): Called with each finished CallStats.
+        history (integer): How many of the most recent calls to keep.
+        """
+        self.callback = callback
+        self.calls = deque(maxlen=history)
+        self.totals = {} # algorithm name -> dict of summed counters
+
+    def start(self, name):
+        """Return fresh CallStats for a call that starts now."""
+        return CallStats(name)
+
+    def finish(self, stats):
+        """Record the finished call `stats`."""
+        stats.seconds = perf_counter() - stats.start_time
+        self.calls.append(stats)
+
+        totals = self.totals.get(stats.name)
+        if totals is None:
+            totals = self.totals[stats.name] = dict.fromkeys(
+                ('calls', 'seconds') + COUNTERS, 0)
+        totals['calls'] += 1
+        totals['seconds'] += stats.seconds
+        for counter in COUNTERS:
+            if counter == 'peak_frontier':
+                totals[counter] = max(totals[counter], stats.peak_frontier)
+            else:
+                totals[counter] += getattr(stats, counter)
+
+        if self.callback is not None:
+            self.callback(stats)
+
+    def reset(self):
+        """Forget every recorded call."""
+        self.calls.clear()
+        self.totals.clear()
+
+
+class InstrumentationMixin:
+    """
+    Adds opt-in instrumentation to a graph class. The class must set
+    `instrumentation` and `active_stats` to None on creation.
+
+    While disabled, instrumented methods only pay for a None check per call
+    and per vertex.
+    """
+    def enable_instrumentation(self, callback=None, history=100):
+        """
+        Start recording per-call stats for the graph's algorithms.
+
+        Parameters:
+        callback (function): Called with the CallStats of every finished call.
+        history (integer): How many of the most recent calls to keep.
+
+        Returns:
+        Instrumentation: The object holding the recorded stats.
+        """
+        self.instrumentation = Instrumentation(callback, history)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stop recording stats."""
+        self.instrumentation = None
+
+
+def instrumented(method):
+    """
+    Decorate a graph method so each call is timed while instrumentation is
+    enabled. The method can add to the counters of `self.active_stats`,
+    which is None when instrumentation is disabled.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+
+        outer_stats = self.active_stats
+        self.active_stats = stats = instrumentation.start(method.__name__)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.active_stats = outer_stats
+            instrumentation.finish(stats)
+    return wrapper
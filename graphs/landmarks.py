@@ -0,0 +1,219 @@
+import struct
+from array import array
+
+from util.snapshot import SectionReader, decode_ids, encode_ids, write_binary_file
+
+
+# Landmark file layout, in the shared format of `write_binary_file`:
+#
+#   header       magic, version, flags, vertex count, landmark count, id bytes
+#   landmarks    int64[k]        vertex index of each landmark
+#   forward      float64[k * V]  distance from each landmark to each vertex
+#   backward     float64[k * V]  distance from each vertex to each landmark
+#                                (directed graphs only)
+#   id_offsets   int64[V + 1]    start of each id in the id blob
+#   id_blob      bytes           the UTF-8 encoded ids, back to back
+MAGIC = b'GRAPHALT'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqqq')
+
+FLAG_DIRECTED = 1
+
+
+class LandmarkOracle:
+    """ LandmarkOracle Class
+    Precomputed shortest distances from and to a few landmark vertices of a
+    weighted graph, giving lower bounds on the distance between any two
+    vertices by the triangle inequality (the ALT technique).
+
+    For a landmark L, d(u, v) >= d(L, v) - d(L, u) and d(u, v) >= d(u, L) -
+    d(v, L). The best of these bounds over all landmarks is a consistent A*
+    heuristic that steers the search towards the target far better than
+    coordinates can on road-like graphs:
+
+        oracle = LandmarkOracle.build(graph, num_landmarks=16)
+        graph.astar(start_id, target_id, heuristic=oracle.lower_bound)
+
+    The tables cost 2 * k * V floats (half that for undirected graphs) and
+    must be rebuilt if edge weights drop or edges are added.
+    """
+    def __init__(self, ids, landmarks, forward, backward, is_directed=True):
+        """
+        Initialize an oracle from its precomputed tables.
+
+        Parameters:
+        ids (list<string>): The vertex ids, in index order.
+        landmarks (array<int>): The index of each landmark vertex.
+        forward (array<float>): `forward[l * V + i]` is the distance from
+            landmark l to the vertex with index i (INFINITY if unreachable).
+        backward (array<float>): `backward[l * V + i]` is the distance from
+            the vertex with index i to landmark l. The same array as
+            `forward` for undirected graphs.
+        is_directed (boolean): Whether the graph is directed.
+        """
+        self.ids = ids
+        self.index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.is_directed = is_directed
+
+    @classmethod
+    def build(cls, graph, num_landmarks=8, landmark_ids=None):
+        """
+        Choose landmarks for `graph` and compute their distance tables.
+
+        Unless given, landmarks are chosen by farthest-point selection: the
+        first is the vertex farthest from an arbitrary start, and each next
+        one is the vertex farthest from every landmark chosen so far (a vertex
+        no landmark reaches counts as infinitely far, so every component gets
+        a landmark before any gets a second). Landmarks on the edge of the
+        graph give the tightest bounds.
+
+        Parameters:
+        graph (WeightedGraph): The graph to preprocess. Weights must not be
+            negative.
+        num_landmarks (integer): How many landmarks to choose.
+        landmark_ids (list<string>): Use these vertices as the landmarks
+            instead of choosing them.
+
+        Returns:
+        LandmarkOracle: The oracle for `graph`.
+        """
+        frozen = graph.freeze()
+        reverse = frozen.reverse()
+        n = len(frozen)
+        if n == 0:
+            return cls([], array('q'), array('d'), array('d'), graph.is_directed)
+
+        if landmark_ids is not None:
+            landmarks = array('q', (frozen.index[vertex_id]
+                for vertex_id in landmark_ids))
+            forward = array('d')
+            for landmark in landmarks:
+                forward.extend(_distances(frozen, landmark))
+        else:
+            landmarks = array('q')
+            forward = array('d')
+            # Distance from the nearest landmark so far, seeded from vertex 0
+            # so that the first landmark is the vertex farthest from it.
+            nearest = _distances(frozen, 0)
+            while len(landmarks) < min(num_landmarks, n):
+                candidate = max((i for i in range(n) if i not in landmarks),
+                    key=nearest.__getitem__)
+                if landmarks and nearest[candidate] == 0:
+                    break # no vertex is any farther from the landmarks
+                landmarks.append(candidate)
+                distances = _distances(frozen, candidate)
+                forward.extend(distances)
+                if len(landmarks) == 1:
+                    nearest = distances
+                else:
+                    nearest = array('d', map(min, nearest, distances))
+
+        if not graph.is_directed:
+            return cls(frozen.ids, landmarks, forward, forward, False)
+
+        backward = array('d')
+        for landmark in landmarks:
+            backward.extend(_distances(reverse, landmark))
+        return cls(frozen.ids, landmarks, forward, backward, True)
+
+    def lower_bound(self, vertex_id, target_id):
+        """
+        Return a lower bound on the distance from `vertex_id` to `target_id`.
+
+        The signature matches an A* heuristic, so this method can be passed
+        straight to `WeightedGraph.astar`. INFINITY means the target is
+        certainly unreachable.
+        """
+        n = len(self.ids)
+        u = self.index[vertex_id]
+        v = self.index[target_id]
+        forward, backward = self.forward, self.backward
+        best = 0
+        # Subtracting two infinite distances gives NaN, which never compares
+        # greater, so landmarks that reach neither vertex are skipped.
+        for base in range(0, len(self.landmarks) * n, n):
+            bound = forward[base + v] - forward[base + u]
+            if bound > best:
+                best = bound
+            bound = backward[base + u] - backward[base + v]
+            if bound > best:
+                best = bound
+        return best
+
+    def upper_bound(self, vertex_id, target_id):
+        """
+        Return an upper bound on the distance from `vertex_id` to `target_id`:
+        the length of the shortest detour through a landmark.
+        """
+        n = len(self.ids)
+        u = self.index[vertex_id]
+        v = self.index[target_id]
+        forward, backward = self.forward, self.backward
+        return min((backward[base + u] + forward[base + v]
+            for base in range(0, len(self.landmarks) * n, n)),
+            default=float('inf'))
+
+    def get_landmarks(self):
+        """Return the ids of the landmark vertices."""
+        return [self.ids[i] for i in self.landmarks]
+
+    def save(self, filename):
+        """
+        Write the landmark tables to `filename` in a binary format.
+
+        Vertex ids are stored as strings.
+
+        Parameters:
+        filename (string): The path of the file to write.
+        """
+        encoded_ids, id_offsets = encode_ids(self.ids)
+        sections = [array('q', self.landmarks), array('d', self.forward)]
+        if self.is_directed:
+            sections.append(array('d', self.backward))
+        sections.append(id_offsets)
+
+        header = HEADER.pack(MAGIC, VERSION,
+            FLAG_DIRECTED if self.is_directed else 0, len(self.ids),
+            len(self.landmarks), id_offsets[-1])
+        write_binary_file(filename, header, sections, encoded_ids)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read landmark tables written by `save`.
+
+        Parameters:
+        filename (string): The path of the file to read.
+
+        Returns:
+        LandmarkOracle: The oracle, keyed by string vertex ids.
+        """
+        with open(filename, 'rb') as landmark_file:
+            data = landmark_file.read()
+
+        reader = SectionReader(data, HEADER, MAGIC, VERSION, 'landmark file')
+        flags, num_vertices, num_landmarks, id_bytes = reader.fields
+        landmarks = reader.section('q', num_landmarks)
+        forward = reader.section('d', num_landmarks * num_vertices)
+        is_directed = bool(flags & FLAG_DIRECTED)
+        backward = reader.section('d', num_landmarks * num_vertices) \
+            if is_directed else forward
+        id_offsets = reader.section('q', num_vertices + 1)
+        ids = decode_ids(reader.blob(id_bytes), id_offsets)
+        return cls(ids, landmarks, forward, backward, is_directed)
+
+
+def _distances(frozen, source):
+    """
+    Return an array of the distances from the vertex with index `source` of
+    the weighted CSRGraph `frozen` to every vertex, INFINITY if unreachable.
+    """
+    distances = array('d', [float('inf')]) * len(frozen)
+    vertex_to_distance, _ = frozen.shortest_path_tree(frozen.ids[source])
+    index = frozen.index
+    for vertex_id, distance in vertex_to_distance.items():
+        distances[index[vertex_id]] = distance
+    return distances
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from functools import wraps
+
+
+class QueryCache:
+    """ QueryCache Class
+    A least-recently-used cache of query results for one graph.
+
+    Entries are only valid for the graph version they were computed at; the
+    first lookup after the graph changes drops them all.
+    """
+    def __init__(self, maxsize=128):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+        maxsize (integer): The most results to keep.
+        """
+        self.maxsize = maxsize
+        self.results = OrderedDict() # key -> result, oldest first
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, version):
+        """
+        Return (True, result) if `key` is cached for `version`, and
+        (False, None) otherwise.
+        """
+        if version != self.version:
+            self.results.clear()
+            self.version = version
+        if key in self.results:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return True, self.results[key]
+        self.misses += 1
+        return False, None
+
+    def store(self, key, version, result):
+        """Cache `result` under `key` for `version`."""
+        if version != self.version or self.maxsize <= 0:
+            return
+        self.results[key] = result
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached result and reset the statistics."""
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Return the cache statistics.
+
+        Returns:
+        dict: The number of hits and misses, the current size and the maximum
+        size.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+            'size': len(self.results), 'maxsize': self.maxsize}
+
+
+class QueryCacheMixin:
+    """
+    Adds an opt-in result cache to a graph class. The class must keep a
+    `version` counter that every mutation bumps, and a `query_cache`
+    attribute that starts as None.
+    """
+    def enable_cache(self, maxsize=128):
+        """
+        Start caching the results of expensive queries.
+
+        Every call still gets its own copy of any lists, dicts and tuples in a
+        result, so callers may modify what they are given.
+
+        Parameters:
+        maxsize (integer): The most results to keep.
+        """
+        self.query_cache = QueryCache(maxsize)
+
+    def disable_cache(self):
+        """Stop caching query results and drop the cache."""
+        self.query_cache = None
+
+    def cache_info(self):
+        """Return the cache statistics, or None if caching is disabled."""
+        if self.query_cache is None:
+            return None
+        return self.query_cache.info()
+
+
+def cached_query(method):
+    """
+    Decorate a graph method so its results are served from the graph's query
+    cache (when enabled), keyed on the method name and arguments.
+
+    The cache keeps its own copy of each result and hands out a fresh copy on
+    every hit, so changing a returned path or distance map cannot leak into
+    later calls.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.query_cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            found, result = cache.lookup(key, self.version)
+        except TypeError: # unhashable arguments cannot be cached
+            return method(self, *args, **kwargs)
+        if found:
+            return _copy_result(result)
+        result = method(self, *args, **kwargs)
+        cache.store(key, self.version, _copy_result(result))
+        return result
+    return wrapper
+
+
+def _copy_result(result):
+    """Copy the lists, dicts and tuples of a query result, all the way down."""
+    if isinstance(result, list):
+        return [_copy_result(item) for item in result]
+    if isinstance(result, dict):
+        return {key: _copy_result(value) for key, value in result.items()}
+    if isinstance(result, tuple):
+        return tuple(_copy_result(item) for item in result)
+    return result
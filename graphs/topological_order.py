@@ -0,0 +1,83 @@
+class OnlineTopologicalOrder:
+    """ OnlineTopologicalOrder Class
+    Keeps a topological order of a directed acyclic Graph valid as edges are
+    added, using the Pearce-Kelly algorithm.
+
+    An edge that already agrees with the order costs O(1). Otherwise only the
+    vertices whose positions lie between the edge's endpoints and that are
+    connected to them are searched and reordered, rather than the whole graph.
+    """
+    def __init__(self, graph):
+        """
+        Initialize the order from the current state of `graph`.
+
+        Parameters:
+        graph (Graph): A directed acyclic graph. Its `vertex_dict` and
+            `reverse_dict` are read when an edge needs reordering.
+        """
+        if not graph.is_directed:
+            raise ValueError('Only directed graphs have a topological order.')
+        self.graph = graph
+        self.order = graph.topological_sort() # position -> id
+        self.position = {vertex_id: i for i, vertex_id in enumerate(self.order)}
+
+    def add_vertex(self, vertex_id):
+        """Place a new vertex, which has no edges yet, at the end of the order."""
+        if vertex_id not in self.position:
+            self.position[vertex_id] = len(self.order)
+            self.order.append(vertex_id)
+
+    def insert_edge(self, start_id, end_id):
+        """
+        Update the order for a new edge from `start_id` to `end_id`. Must be
+        called before the edge is stored in the graph.
+
+        Raises:
+        ValueError: If the edge would create a cycle; the order is unchanged.
+        """
+        position = self.position
+        lower_bound = position[end_id]
+        upper_bound = position[start_id]
+        if lower_bound > upper_bound:
+            return # the edge already agrees with the order
+
+        # Vertices reachable from end_id that are placed no later than start_id.
+        # Reaching start_id itself means the edge closes a cycle.
+        forward = {end_id: None} # id -> the vertex we reached it from
+        stack = [end_id]
+        while stack:
+            vertex = stack.pop()
+            if vertex == start_id:
+                cycle = [vertex]
+                while forward[cycle[-1]] is not None:
+                    cycle.append(forward[cycle[-1]])
+                cycle.reverse()
+                raise ValueError(f'Edge ({start_id}, {end_id}) would create a '
+                    f'cycle: {[start_id] + cycle}')
+            for neighbor in self.graph.vertex_dict[vertex]:
+                if neighbor not in forward and position[neighbor] <= upper_bound:
+                    forward[neighbor] = vertex
+                    stack.append(neighbor)
+
+        # Vertices that reach start_id and are placed no earlier than end_id.
+        backward = {start_id}
+        stack = [start_id]
+        while stack:
+            vertex = stack.pop()
+            for neighbor in self.graph.reverse_dict[vertex]:
+                if neighbor not in backward and position[neighbor] >= lower_bound:
+                    backward.add(neighbor)
+                    stack.append(neighbor)
+
+        # Reuse the same set of positions, putting everything that reaches
+        # start_id before everything reachable from end_id.
+        by_position = position.__getitem__
+        affected = sorted(backward, key=by_position) + sorted(forward, key=by_position)
+        slots = sorted(map(by_position, affected))
+        for vertex_id, slot in zip(affected, slots):
+            position[vertex_id] = slot
+            self.order[slot] = vertex_id
+
+    def get_order(self):
+        """Return the vertex ids in topological order."""
+        return list(self.order)
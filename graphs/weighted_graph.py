@@ -1,6 +1,23 @@
+from heapq import heappop, heappush
+from itertools import count
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; Floyd-Warshall falls back to lists
+    np = None
+
+from graphs.connectivity import ComponentTrackingMixin
+from graphs.csr_graph import CSRGraph
+from graphs.disjoint_set import DisjointSet
+from graphs.heuristics import HEURISTICS, zero
+from graphs.instrumentation import InstrumentationMixin, instrumented
+from graphs.query_cache import QueryCacheMixin, cached_query
+
 
 class WeightedVertex():
-    
+    # No per-instance __dict__, which matters with millions of vertices.
+    __slots__ = ('id', 'neighbors_dict')
+
     def __init__(self, vertex_id):
         """
         Initialize a vertex and its neighbors dictionary.
@@ -32,6 +49,13 @@ class WeightedVertex():
         """Return the neighbors of this vertex."""
         return list(self.neighbors_dict.values())
 
+    def iter_neighbors_with_weights(self):
+        """
+        Iterate over the (neighbor object, weight) pairs of this vertex without
+        building a list, for use in the graph algorithms' inner loops.
+        """
+        return iter(self.neighbors_dict.values())
+
     def get_id(self):
         """Return the id of this vertex."""
         return self.id
@@ -47,7 +71,7 @@ class WeightedVertex():
         return f'{self.id} adjacent to {neighbor_ids}'
 
 
-class WeightedGraph():
+class WeightedGraph(QueryCacheMixin, ComponentTrackingMixin, InstrumentationMixin):
 
     INFINITY = float('inf')
 
@@ -60,6 +84,12 @@ class WeightedGraph():
         """
         self.vertex_dict = {} # id -> obj
         self.is_directed = is_directed
+        self.version = 0 # bumped on every change, to invalidate cached queries
+        self.query_cache = None
+        self.components = None # DisjointSet, while tracking components
+        self.components_stale = False
+        self.instrumentation = None # Instrumentation, while enabled
+        self.active_stats = None # CallStats of the instrumented call running
 
     def add_vertex(self, vertex_id):
         """
@@ -75,6 +105,9 @@ class WeightedGraph():
             return False # it's already there
         vertex_obj = WeightedVertex(vertex_id)
         self.vertex_dict[vertex_id] = vertex_obj
+        self.version += 1
+        if self.components is not None:
+            self.components.add(vertex_id)
         return True
 
     def get_vertex(self, vertex_id):
@@ -101,142 +134,433 @@ class WeightedGraph():
         vertex_obj1.add_neighbor(vertex_obj2, weight)
         if not self.is_directed:
             vertex_obj2.add_neighbor(vertex_obj1, weight)
+        self.version += 1
+        if self.components is not None:
+            self.components.union(vertex_id1, vertex_id2)
 
     def get_vertices(self):
         """Return all the vertices in the graph"""
         return list(self.vertex_dict.values())
 
+    def _edge_ids(self):
+        """Iterate over every stored edge as a (start_id, end_id) tuple."""
+        for vertex_id, vertex in self.vertex_dict.items():
+            for neighbor_id in vertex.neighbors_dict:
+                yield vertex_id, neighbor_id
+
+    def freeze(self):
+        """
+        Return a compact, read-only copy of the graph with vertex ids interned
+        to integers and the edges and weights stored in flat arrays.
+
+        Returns:
+        CSRGraph: The frozen graph.
+        """
+        return CSRGraph.from_weighted_graph(self)
+
     def __iter__(self):
         """Iterate over the vertex objects in the graph, to use sytax:
         for vertex in graph"""
         return iter(self.vertex_dict.values())
 
-    def union(self, parent_map, vertex_id1, vertex_id2):
-        """Combine vertex_id1 and vertex_id2 into the same group."""
-        vertex1_root = self.find(parent_map, vertex_id1)
-        vertex2_root = self.find(parent_map, vertex_id2)
-        parent_map[vertex1_root] = vertex2_root
-
-    def find(self, parent_map, vertex_id):
-        """Get the root (or, group label) for vertex_id."""
-        if(parent_map[vertex_id] == vertex_id):
-            return vertex_id
-        return self.find(parent_map, parent_map[vertex_id])
-
+    @cached_query
+    @instrumented
     def minimum_spanning_tree_kruskal(self):
         """
         Use Kruskal's Algorithm to return a list of edges, as tuples of 
         (start_id, dest_id, weight) in the graph's minimum spanning tree.
+
+        If the graph is not connected, the edges of a minimum spanning forest
+        are returned.
         """
         # Create a list of all edges in the graph, sort them by weight 
         # from smallest to largest
         edges = []
         for vertex in self.get_vertices():
-            for neighbor, neighbor_weight in vertex.get_neighbors_with_weights():
+            for neighbor, neighbor_weight in vertex.iter_neighbors_with_weights():
                 edges.append((vertex.id, neighbor.id, neighbor_weight))
         edges.sort(key=lambda edge: edge[2])
 
-        # Create a dictionary `parent_map` to map vertex -> its "parent". 
-        # Initialize it so that each vertex is its own parent.
-        parent_map = {vertext.id:vertext.id for vertext in self.get_vertices()}
+        # Start with each vertex in its own set.
+        components = DisjointSet(self.vertex_dict)
 
-        # Create an empty list to hold the solution (i.e. all edges in the 
-        # final spanning tree)
+        # Walk the sorted edges once. If the two vertices connected by an edge
+        # are in different sets it will not create a cycle, so add it to the
+        # solution. Stop as soon as the tree holds V-1 edges.
         spanning_tree = []
-
-        # While the spanning tree holds < V-1 edges, get the smallest 
-        # edge. If the two vertices connected by the edge are in different sets 
-        # (i.e. calling `find()` gets two different roots), then it will not 
-        # create a cycle, so add it to the solution set and call `union()` on 
-        # the two vertices.
-        while len(spanning_tree) < len(self.vertex_dict)-1:
-            smallest_edge = edges.pop(0)
-            vertex1_root = self.find(parent_map, smallest_edge[0])
-            vertex2_root = self.find(parent_map, smallest_edge[1])
-            if vertex1_root != vertex2_root:
-                spanning_tree.append(smallest_edge)
-                self.union(parent_map, smallest_edge[0], smallest_edge[1])
+        tree_size = len(self.vertex_dict) - 1
+        edges_scanned = 0
+        for edge in edges:
+            if len(spanning_tree) >= tree_size:
+                break
+            edges_scanned += 1
+            if components.union(edge[0], edge[1]):
+                spanning_tree.append(edge)
+
+        if self.active_stats is not None:
+            self.active_stats.edges_scanned += edges_scanned
 
         # Return the solution list.
         return spanning_tree
 
-    def get_smallest_vetext(self, vertex_to):
-        smallest_vertex_id = list(vertex_to.keys())[0]
-        for vertex_id in vertex_to:
-            if vertex_to[vertex_id] < vertex_to[smallest_vertex_id]:
-                smallest_vertex_id = vertex_id
-        return smallest_vertex_id
-
-    def minimum_spanning_tree_prim(self):
+    @cached_query
+    @instrumented
+    def minimum_spanning_tree_prim(self, return_edges=False):
         """
         Use Prim's Algorithm to return the total weight of all edges in the
         graph's spanning tree.
 
-        Assume that the graph is connected.
-        """
-        # Create a dictionary `vertex_to_weight` and initialize all
-        # vertices to INFINITY - hint: use `float('inf')`
-        vertex_to_weight = {vertex.id:self.INFINITY for vertex in self.get_vertices()} # minheap would be a better option
+        A lazy binary heap of candidate edges keeps the run at O(E log V). If
+        the graph is not connected, a tree is grown from every component, giving
+        a minimum spanning forest.
 
-        # Choose one vertex and set its weight to 0
-        vertex_to_weight[self.get_vertices()[0].id] = 0
+        Parameters:
+        return_edges (boolean): Whether to also return the tree edges.
 
+        Returns:
+        number: The total weight of the spanning tree (or forest). If
+        `return_edges` is True, a tuple of the list of edges, as tuples of
+        (start_id, dest_id, weight), and the total weight.
+        """
+        stats = self.active_stats
+        in_tree = set()
+        spanning_tree = []
         total_mst_weight = 0
-        # While `vertex_to_weight` is not empty:
-        while vertex_to_weight:
-            # 1. Get the minimum-weighted remaining vertex, remove it from the
-            # dictionary, & add its weight to the total MST weight
-            smallest_vertex_id = self.get_smallest_vetext(vertex_to_weight)
-            total_mst_weight += vertex_to_weight[smallest_vertex_id]
-            del vertex_to_weight[smallest_vertex_id]
-
-            # 2. Update that vertex's neighbors, if edge weights are smaller than
-            # previous weights
-            smallest_vertex = self.vertex_dict[smallest_vertex_id]
-            for neighbor, neighbor_weight in smallest_vertex.get_neighbors_with_weights():
-                if neighbor.id in vertex_to_weight and neighbor_weight < vertex_to_weight[neighbor.id]:
-                    vertex_to_weight[neighbor.id] = neighbor_weight
-
-        # Return total weight of MST
+        tie_breaker = count()
+
+        for root_id in self.vertex_dict:
+            if root_id in in_tree:
+                continue
+            in_tree.add(root_id)
+
+            # Heap entries are (weight, tie breaker, start_id, dest_id) for
+            # every edge leaving the tree; stale ones are skipped when popped.
+            heap = []
+            for neighbor, weight in self.vertex_dict[root_id].iter_neighbors_with_weights():
+                heappush(heap, (weight, next(tie_breaker), root_id, neighbor.id))
+            if stats is not None:
+                stats.vertices_dequeued += 1
+                stats.edges_scanned += len(heap)
+                stats.heap_pushes += len(heap)
+
+            while heap:
+                if stats is not None:
+                    stats.observe_frontier(len(heap))
+                weight, _, start_id, dest_id = heappop(heap)
+                if dest_id in in_tree:
+                    continue
+                in_tree.add(dest_id)
+                spanning_tree.append((start_id, dest_id, weight))
+                total_mst_weight += weight
+
+                heap_size = len(heap)
+                dest_vertex = self.vertex_dict[dest_id]
+                for neighbor, neighbor_weight in dest_vertex.iter_neighbors_with_weights():
+                    if neighbor.id not in in_tree:
+                        heappush(heap, (neighbor_weight, next(tie_breaker), dest_id, neighbor.id))
+                if stats is not None:
+                    stats.vertices_dequeued += 1
+                    stats.edges_scanned += len(dest_vertex.neighbors_dict)
+                    stats.heap_pushes += len(heap) - heap_size
+
+        if return_edges:
+            return spanning_tree, total_mst_weight
         return total_mst_weight
 
-    def find_shortest_path(self, start_id, target_id):
+    @cached_query
+    @instrumented
+    def find_shortest_path(self, start_id, target_id, return_path=False):
         """
         Use Dijkstra's Algorithm to return the total weight of the shortest path
         from a start vertex to a destination.
+
+        The search stops as soon as the target vertex is settled.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+        return_path (boolean): Whether to also return the vertex path.
+
+        Returns:
+        number: The total weight of the shortest path, or INFINITY if the
+        target cannot be reached. If `return_path` is True, a tuple of the
+        weight and the list of vertex ids from start to end (None if the
+        target cannot be reached).
+        """
+        if target_id not in self.vertex_dict:
+            raise KeyError("The target vertex is not in the graph!")
+        vertex_to_distance, vertex_to_parent = self._dijkstra(start_id, target_id)
+
+        distance = vertex_to_distance.get(target_id, self.INFINITY)
+        if not return_path:
+            return distance
+        if distance == self.INFINITY:
+            return distance, None
+
+        path = [target_id]
+        while path[-1] != start_id:
+            path.append(vertex_to_parent[path[-1]])
+        path.reverse()
+        return distance, path
+
+    @cached_query
+    @instrumented
+    def shortest_path_tree(self, start_id):
+        """
+        Use Dijkstra's Algorithm to find the shortest paths from a start vertex
+        to every vertex it can reach, in a single pass.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+
+        Returns:
+        tuple<dict, dict>: A dictionary mapping each reachable vertex id to its
+        distance from the start, and a dictionary mapping each reachable vertex
+        id to its predecessor on a shortest path (None for the start vertex).
+        """
+        return self._dijkstra(start_id)
+
+    @cached_query
+    @instrumented
+    def astar(self, start_id, target_id, heuristic=None, coordinates=None):
+        """
+        Use the A* Algorithm to find the cheapest path from a start vertex to a
+        destination.
+
+        Vertices are expanded in order of their distance from the start plus
+        the heuristic's estimate of the distance left, so a good estimate keeps
+        the search heading towards the target instead of spreading out in
+        every direction. The estimate must never be more than the true
+        distance, or the path found may not be the shortest.
+
+        Parameters:
+        start_id (string): The id of the start vertex.
+        target_id (string): The id of the target (end) vertex.
+        heuristic (function or string): Either a function taking
+            (vertex_id, target_id) and returning the estimated distance, or
+            the name of a built-in heuristic ('euclidean' or 'haversine') to
+            build from `coordinates`. Defaults to 'euclidean' when coordinates
+            are given and to no estimate (plain Dijkstra) otherwise.
+        coordinates (dict): Maps each vertex id to its (x, y) or
+            (latitude, longitude) position, for the built-in heuristics.
+
+        Returns:
+        tuple: The total weight of the path and the list of vertex ids from
+        start to end, or (INFINITY, None) if the target cannot be reached.
+        """
+        if start_id not in self.vertex_dict:
+            raise KeyError("The start vertex is not in the graph!")
+        if target_id not in self.vertex_dict:
+            raise KeyError("The target vertex is not in the graph!")
+
+        if heuristic is None:
+            heuristic = 'euclidean' if coordinates is not None else zero
+        if isinstance(heuristic, str):
+            if heuristic not in HEURISTICS:
+                raise ValueError(f'Unknown heuristic: {heuristic}')
+            if coordinates is None:
+                raise ValueError(f'The {heuristic} heuristic needs coordinates.')
+            heuristic = HEURISTICS[heuristic](coordinates)
+
+        stats = self.active_stats
+        best_distance = {start_id: 0}
+        vertex_to_parent = {start_id: None}
+
+        # Heap entries are (estimated total, tie breaker, distance, vertex id).
+        # An entry is stale if a shorter distance to its vertex has been found
+        # since it was pushed, which also lets a vertex be expanded again if
+        # the heuristic is admissible but not consistent.
+        tie_breaker = count()
+        heap = [(heuristic(start_id, target_id), next(tie_breaker), 0, start_id)]
+        if stats is not None:
+            stats.heap_pushes += 1
+
+        while heap:
+            if stats is not None:
+                stats.observe_frontier(len(heap))
+            _, _, distance, vertex_id = heappop(heap)
+            if distance > best_distance[vertex_id]:
+                continue
+            if stats is not None:
+                stats.vertices_dequeued += 1
+            if vertex_id == target_id:
+                path = [target_id]
+                while path[-1] != start_id:
+                    path.append(vertex_to_parent[path[-1]])
+                path.reverse()
+                return distance, path
+
+            vertex = self.vertex_dict[vertex_id]
+            if stats is not None:
+                stats.edges_scanned += len(vertex.neighbors_dict)
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                neighbor_id = neighbor.id
+                new_distance = distance + weight
+                if new_distance < best_distance.get(neighbor_id, self.INFINITY):
+                    best_distance[neighbor_id] = new_distance
+                    vertex_to_parent[neighbor_id] = vertex_id
+                    estimate = new_distance + heuristic(neighbor_id, target_id)
+                    heappush(heap, (estimate, next(tie_breaker), new_distance, neighbor_id))
+                    if stats is not None:
+                        stats.edges_relaxed += 1
+                        stats.heap_pushes += 1
+
+        return self.INFINITY, None
+
+    def _dijkstra(self, start_id, target_id=None):
+        """
+        Run Dijkstra's Algorithm from `start_id` with a binary heap, stopping
+        early once `target_id` (if given) is settled.
+
+        Returns:
+        tuple<dict, dict>: The settled distances and the predecessor map.
+        """
+        if start_id not in self.vertex_dict:
+            raise KeyError("The start vertex is not in the graph!")
+
+        stats = self.active_stats
+        vertex_to_distance = {}
+        vertex_to_parent = {start_id: None}
+        tentative = {start_id: 0}
+
+        # Heap entries are (distance, tie breaker, vertex id). Stale entries
+        # are skipped when popped instead of being removed from the heap.
+        tie_breaker = count()
+        heap = [(0, next(tie_breaker), start_id)]
+
+        if stats is not None:
+            stats.heap_pushes += 1
+
+        while heap:
+            if stats is not None:
+                stats.observe_frontier(len(heap))
+            distance, _, vertex_id = heappop(heap)
+            if vertex_id in vertex_to_distance:
+                continue
+            vertex_to_distance[vertex_id] = distance
+            if stats is not None:
+                stats.vertices_dequeued += 1
+            if vertex_id == target_id:
+                break
+
+            vertex = self.vertex_dict[vertex_id]
+            if stats is not None:
+                stats.edges_scanned += len(vertex.neighbors_dict)
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                neighbor_id = neighbor.id
+                if neighbor_id in vertex_to_distance:
+                    continue
+                new_distance = distance + weight
+                if new_distance < tentative.get(neighbor_id, self.INFINITY):
+                    tentative[neighbor_id] = new_distance
+                    vertex_to_parent[neighbor_id] = vertex_id
+                    heappush(heap, (new_distance, next(tie_breaker), neighbor_id))
+                    if stats is not None:
+                        stats.edges_relaxed += 1
+                        stats.heap_pushes += 1
+
+        for vertex_id in tentative.keys() - vertex_to_distance.keys():
+            del vertex_to_parent[vertex_id]
+        return vertex_to_distance, vertex_to_parent
+
+    @instrumented
+    def floyd_warshall(self, return_predecessors=False):
+        """
+        Return the All-Pairs-Shortest-Paths matrix, containing the shortest
+        distances from each vertex to each other vertex.
+
+        When NumPy is installed the matrix is a dense ndarray and each round of
+        the algorithm is a single broadcast `np.minimum`; otherwise nested
+        lists are used.
+
+        Parameters:
+        return_predecessors (boolean): Whether to also return the predecessor
+            matrix.
+
+        Returns:
+        tuple: The distance matrix, where `dist[i][j]` is the distance from the
+        vertex with index i to the vertex with index j (INFINITY if it cannot
+        be reached), and a dictionary mapping each vertex id to its index (in
+        index order, so `list(index)` maps indices back to ids). If
+        `return_predecessors` is True, the predecessor matrix is returned third:
+        `pred[i][j]` is the index of the vertex before j on a shortest path
+        from i, or -1 if there is none.
         """
-        # Create a dictionary `vertex_to_distance` and initialize all
-        # vertices to INFINITY - hint: use `float('inf')`
-        vertex_to_distance = {vertex_id:self.INFINITY for vertex_id in self.vertex_dict}
-
-        # Set the start ids distance to 0
-        vertex_to_distance[start_id] = 0
-
-        # While `vertex_to_distance` is not empty:
-        while vertex_to_distance:
-            # 1. Get the minimum-distance remaining vertex, remove it from the
-            #    dictionary. If it is the target vertex, return its distance.
-            smallest_vertex_id = self.get_smallest_vetext(vertex_to_distance)
-            if smallest_vertex_id == target_id:
-                return vertex_to_distance[target_id]
-
-            # 2. Update that vertex's neighbors by adding the edge weight to the
-            #    vertex's distance, if it is lower than previous.
-            smallest_vertex = self.vertex_dict[smallest_vertex_id]
-            for neighbor, neighbor_weight in smallest_vertex.get_neighbors_with_weights():
-                if neighbor.id in vertex_to_distance and neighbor_weight < vertex_to_distance[neighbor.id]:
-                    vertex_to_distance[neighbor.id] = neighbor_weight + vertex_to_distance[smallest_vertex_id]
-            del vertex_to_distance[smallest_vertex_id]
-
-
-    def floyd_warshall(self):
-        """
-        Return the All-Pairs-Shortest-Paths dictionary, containing the shortest
-        paths from each vertex to each other vertex.
-        """
-        dist = {vertex.id:{vertext.id:self.INFINITY for vertex in self.vertex_dict} for vertext in self.vertex_dict}
-        for k in dist:
-            for i in dist:
-                for j in dist:
-                    dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
-        return dist
+        index = {vertex_id: i for i, vertex_id in enumerate(self.vertex_dict)}
+        if np is not None:
+            dist, pred = self._floyd_warshall_numpy(index, return_predecessors)
+        else:
+            dist, pred = self._floyd_warshall_lists(index, return_predecessors)
+
+        if return_predecessors:
+            return dist, index, pred
+        return dist, index
+
+    def _floyd_warshall_numpy(self, index, return_predecessors):
+        """Run Floyd-Warshall on a dense NumPy matrix."""
+        n = len(index)
+        dist = np.full((n, n), self.INFINITY)
+        pred = np.full((n, n), -1, dtype=np.intp) if return_predecessors else None
+
+        # Seed the edge weights (keeping the lightest parallel edge) and the
+        # zero diagonal.
+        for vertex_id, vertex in self.vertex_dict.items():
+            i = index[vertex_id]
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                j = index[neighbor.id]
+                if weight < dist[i, j]:
+                    dist[i, j] = weight
+                    if pred is not None:
+                        pred[i, j] = i
+        np.fill_diagonal(dist, 0)
+        if pred is not None:
+            np.fill_diagonal(pred, -1)
+
+        for k in range(n):
+            # Distance of every i -> k -> j path, as an n x n broadcast.
+            via_k = dist[:, k, np.newaxis] + dist[np.newaxis, k, :]
+            if pred is None:
+                np.minimum(dist, via_k, out=dist)
+            else:
+                shorter = via_k < dist
+                dist[shorter] = via_k[shorter]
+                pred[shorter] = np.broadcast_to(pred[k], (n, n))[shorter]
+
+        return dist, pred
+
+    def _floyd_warshall_lists(self, index, return_predecessors):
+        """Run Floyd-Warshall on nested lists, for when NumPy is unavailable."""
+        n = len(index)
+        infinity = self.INFINITY
+        dist = [[infinity] * n for _ in range(n)]
+        pred = [[-1] * n for _ in range(n)] if return_predecessors else None
+
+        for vertex_id, vertex in self.vertex_dict.items():
+            i = index[vertex_id]
+            for neighbor, weight in vertex.iter_neighbors_with_weights():
+                j = index[neighbor.id]
+                if weight < dist[i][j]:
+                    dist[i][j] = weight
+                    if pred is not None:
+                        pred[i][j] = i
+        for i in range(n):
+            dist[i][i] = 0
+            if pred is not None:
+                pred[i][i] = -1
+
+        for k in range(n):
+            dist_k = dist[k]
+            pred_k = pred[k] if pred is not None else None
+            for i in range(n):
+                dist_ik = dist[i][k]
+                if dist_ik == infinity:
+                    continue
+                dist_i = dist[i]
+                for j in range(n):
+                    via_k = dist_ik + dist_k[j]
+                    if via_k < dist_i[j]:
+                        dist_i[j] = via_k
+                        if pred is not None:
+                            pred[i][j] = pred_k[j]
+
+        return dist, pred
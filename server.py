@@ -0,0 +1,369 @@
+"""
+Serve queries against one graph over a local socket, so that many clients
+share a single warm, in-memory copy instead of each rebuilding it.
+
+The protocol is line-delimited JSON. Each request is one line such as
+
+    {"id": 1, "op": "shortest_path", "start": "A", "target": "E"}
+    {"id": 2, "op": "k_hop", "start": "A", "k": 2}
+    {"id": 3, "op": "components"}
+    {"id": 4, "op": "mst"}
+
+and is answered, possibly out of order, by one line carrying the same id
+and either a "result" or an "error".
+
+Usage:
+    python server.py test_files/graph_medium_undirected.txt --port 8765
+    python server.py graph.snapshot --unix /tmp/graph.sock --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from util.file_reader import read_graph_from_file
+from util.snapshot import MAGIC, load_snapshot, save_snapshot
+
+
+def is_snapshot(filename):
+    """Return True if `filename` is a binary snapshot rather than a graph file."""
+    with open(filename, 'rb') as graph_file:
+        return graph_file.read(len(MAGIC)) == MAGIC
+
+
+def load_graph(filename):
+    """
+    Load a graph file or a binary snapshot as a frozen CSRGraph.
+
+    Snapshots are memory-mapped rather than read, so every worker serving
+    the same snapshot shares its pages instead of holding its own copy.
+    """
+    if is_snapshot(filename):
+        return load_snapshot(filename)
+    return read_graph_from_file(filename).freeze()
+
+
+# The graph held by each worker process, loaded once by its initializer, and
+# its mutable copy, built only once a query needs it.
+_worker_graph = None
+_worker_thawed = None
+
+
+def _load_worker(filename):
+    """Load the graph into a worker process."""
+    global _worker_graph, _worker_thawed
+    _worker_graph = load_graph(filename)
+    _worker_thawed = None
+
+
+def _thawed_graph():
+    """Return the worker's graph as a mutable Graph, thawing it on first use."""
+    global _worker_thawed
+    if _worker_thawed is None:
+        _worker_thawed = _worker_graph.thaw()
+    return _worker_thawed
+
+
+def _run_batch(op, requests):
+    """
+    Answer a batch of requests for the same operation in a worker process.
+
+    Returns:
+    list<tuple>: An (error, result) pair per request, in order; error is
+    None on success.
+    """
+    return OPERATIONS[op](_worker_graph, requests)
+
+
+def _shortest_paths(graph, requests):
+    """
+    Answer shortest path requests that all share one start vertex with a
+    single search from it, stopping once every target is settled.
+    """
+    start_id = requests[0]['start']
+    if start_id not in graph.index:
+        return [("The start vertex is not in the graph!", None)] * len(requests)
+
+    distances, parents = graph.shortest_path_tree(start_id,
+        [request['target'] for request in requests])
+
+    answers = []
+    for request in requests:
+        target_id = request['target']
+        if target_id not in graph.index:
+            answers.append(("The target vertex is not in the graph!", None))
+        elif target_id not in distances:
+            answers.append((None, {'distance': None, 'path': None}))
+        else:
+            path = [target_id]
+            while path[-1] != start_id:
+                path.append(parents[path[-1]])
+            path.reverse()
+            answers.append((None, {'distance': distances[target_id], 'path': path}))
+    return answers
+
+
+def _k_hop(graph, requests):
+    """
+    Answer k-hop requests together, with one multi-source BFS for all of
+    their start vertices.
+    """
+    start_ids = [request['start'] for request in requests
+        if request['start'] in graph.index]
+    results = graph.find_vertices_n_away_batch(start_ids,
+        {request['k'] for request in requests})
+
+    answers = []
+    for request in requests:
+        if request['start'] not in results:
+            answers.append(("The start vertex is not in the graph!", None))
+        else:
+            answers.append((None, results[request['start']][request['k']]))
+    return answers
+
+
+def _components(graph, requests):
+    """Answer every pending components request with one traversal."""
+    components = graph.find_connected_components()
+    return [(None, components)] * len(requests)
+
+
+def _minimum_spanning_tree(graph, requests):
+    """Answer every pending minimum spanning tree request with one run of Prim."""
+    if not graph.is_weighted():
+        return [('The graph is not weighted.', None)] * len(requests)
+    edges, total = _thawed_graph().minimum_spanning_tree_prim(return_edges=True)
+    return [(None, {'weight': total, 'edges': edges})] * len(requests)
+
+
+OPERATIONS = {
+    'shortest_path': _shortest_paths,
+    'k_hop': _k_hop,
+    'components': _components,
+    'mst': _minimum_spanning_tree,
+}
+
+# The fields a request for each operation must have.
+REQUIRED_FIELDS = {
+    'shortest_path': ('start', 'target'),
+    'k_hop': ('start', 'k'),
+    'components': (),
+    'mst': (),
+}
+
+
+def _check_request(request):
+    """
+    Return why `request` cannot be run, or None if it is well formed.
+    """
+    op = request.get('op')
+    if not isinstance(op, str) or op not in OPERATIONS:
+        return f'Unknown operation: {op}'
+    for field in REQUIRED_FIELDS[op]:
+        if field not in request:
+            return f'Missing field {field!r} for {op}'
+        if field in ('start', 'target') and not isinstance(request[field], str):
+            return f'{field} must be a string'
+    if op == 'k_hop':
+        k = request['k']
+        if isinstance(k, bool) or not isinstance(k, int) or k < 0:
+            return 'k must be a non-negative integer'
+    return None
+
+
+def _batch_key(request):
+    """Return the key of the batch a request can join."""
+    if request['op'] == 'shortest_path':
+        return ('shortest_path', request['start'])
+    return (request['op'],)
+
+
+class GraphServer:
+    """ GraphServer Class
+    Answers line-delimited JSON queries from a pool of worker processes that
+    each map the same snapshot of the graph.
+
+    Requests arriving within `batch_delay` seconds of each other are batched:
+    shortest paths from the same start share one search, all k-hop queries
+    share one multi-source BFS, and concurrent components or MST requests are
+    computed once.
+    """
+    def __init__(self, filename, max_workers=None, batch_delay=0.002):
+        """
+        Parameters:
+        filename (string): The graph file or snapshot to serve.
+        max_workers (integer): The number of worker processes (default: one
+            per CPU).
+        batch_delay (number): How long to collect requests before running
+            them, in seconds.
+
+        Raises ValueError or OSError if the graph cannot be loaded, so bad
+        input is reported before the server starts listening.
+        """
+        self.filename = filename
+        self.batch_delay = batch_delay
+        # Load the graph once here, and give the workers a snapshot to map:
+        # a graph file is parsed only once and its snapshot kept until close.
+        self.snapshot_dir = None
+        graph = load_graph(filename)
+        if not is_snapshot(filename):
+            self.snapshot_dir = tempfile.TemporaryDirectory()
+            filename = os.path.join(self.snapshot_dir.name, 'graph.snapshot')
+            save_snapshot(graph, filename)
+        # Workers are spawned rather than forked: the pool starts them on the
+        # first query, and a forked worker would inherit the client sockets
+        # open at that moment, keeping those connections from ever closing.
+        self.executor = ProcessPoolExecutor(max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_load_worker, initargs=(filename,))
+        self.pending = [] # (request, future) waiting for the next flush
+        self.flush_handle = None
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Start listening on a TCP port of `host`, or on the Unix socket at
+        `path` if given.
+
+        Returns:
+        asyncio.Server: The listening server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def close(self):
+        """Shut down the worker processes and remove the temporary snapshot."""
+        self.executor.shutdown()
+        if self.snapshot_dir is not None:
+            self.snapshot_dir.cleanup()
+            self.snapshot_dir = None
+
+    async def handle_client(self, reader, writer):
+        """Answer every request line from one client until it disconnects."""
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    # Answer each request in its own task, so pipelined
+                    # requests from one client are batched together too.
+                    task = asyncio.ensure_future(self._answer(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def _answer(self, line, writer):
+        """Parse one request line, run it and write the response line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+            request_id = request.get('id')
+            response = {'id': request_id, 'result': await self.query(request)}
+        except (ValueError, KeyError) as error:
+            message = error.args[0] if error.args else str(error)
+            response = {'id': request_id, 'error': str(message)}
+        writer.write(json.dumps(response).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    def query(self, request):
+        """
+        Queue a request for the next batch.
+
+        Returns:
+        asyncio.Future: Resolves to the result, or raises KeyError or
+        ValueError if the request cannot be answered.
+        """
+        error = _check_request(request)
+        if error is not None:
+            raise ValueError(error)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((request, future))
+        if self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_delay, self._flush)
+        return future
+
+    def _flush(self):
+        """Send the pending requests to the workers, one job per batch."""
+        self.flush_handle = None
+        pending, self.pending = self.pending, []
+
+        batches = defaultdict(list)
+        for request, future in pending:
+            batches[_batch_key(request)].append((request, future))
+
+        loop = asyncio.get_running_loop()
+        for key, batch in batches.items():
+            requests = [request for request, _ in batch]
+            try:
+                job = loop.run_in_executor(self.executor, _run_batch, key[0], requests)
+            except RuntimeError as error: # the pool is broken or shut down
+                job = loop.create_future()
+                job.set_exception(error)
+            job.add_done_callback(lambda job, batch=batch: self._resolve(job, batch))
+
+    @staticmethod
+    def _resolve(job, batch):
+        """Hand the answers of a finished job to the waiting requests."""
+        if job.exception() is not None:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ValueError(f'Query failed: {job.exception()}'))
+            return
+        for (_, future), (error, result) in zip(batch, job.result()):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(KeyError(error))
+            else:
+                future.set_result(result)
+
+
+async def serve(filename, host, port, path, max_workers, batch_delay):
+    """Run a GraphServer until cancelled."""
+    graph_server = GraphServer(filename, max_workers, batch_delay)
+    server = await graph_server.start(host, port, path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        graph_server.close()
+
+
+def main(argv=None):
+    """Parse the command line and serve the graph."""
+    parser = argparse.ArgumentParser(
+        description='Serve graph queries over line-delimited JSON.')
+    parser.add_argument('graph', help='a graph file or binary snapshot')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead')
+    parser.add_argument('--workers', type=int, default=None,
+        help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--batch-delay', type=float, default=0.002,
+        help='seconds to collect requests into a batch (default: 0.002)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.graph, args.host, args.port, args.unix,
+            args.workers, args.batch_delay))
+    except (OSError, ValueError) as error:
+        parser.error(f'cannot serve {args.graph}: {error}')
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
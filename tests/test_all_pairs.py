@@ -0,0 +1,38 @@
+import unittest
+from graphs.graph import Graph
+from util.file_reader import read_graph_from_file
+
+
+class TestAllPairsBfs(unittest.TestCase):
+
+    def test_distance_matrix(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+
+        dist, index = graph.distance_matrix(max_workers=2)
+        self.assertEqual(list(index), graph.get_vertices())
+        for start_id in index:
+            for distance in range(4):
+                expected = sorted(graph.find_vertices_n_away(start_id, distance))
+                actual = sorted(end_id for end_id in index
+                    if dist[index[start_id]][index[end_id]] == distance)
+                self.assertEqual(actual, expected)
+
+    def test_all_pairs_bfs_sources(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+
+        expected = {'C': [-1, -1, 0, -1], 'A': [0, 1, 2, -1]}
+        for max_workers in (1, 2):
+            results = {source_id: list(distances) for source_id, distances
+                in graph.all_pairs_bfs(['C', 'A'], max_workers=max_workers)}
+            self.assertEqual(results, expected)
+
+        with self.assertRaises(KeyError):
+            graph.all_pairs_bfs(['Z'])
+
+
+if __name__ == '__main__':
+    unittest.main()
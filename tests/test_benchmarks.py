@@ -0,0 +1,38 @@
+import unittest
+from benchmarks import generators
+from benchmarks.run import run
+
+
+class TestGenerators(unittest.TestCase):
+
+    def test_generators_are_seeded(self):
+        for generator in generators.GENERATORS.values():
+            first = generator(50, seed=3)
+            second = generator(50, seed=3)
+            self.assertEqual(str(first), str(second))
+
+    def test_chain_dag_is_acyclic(self):
+        graph = generators.chain_dag(200)
+        self.assertEqual(graph.topological_sort(), [str(i) for i in range(200)])
+
+    def test_grid_2d(self):
+        graph = generators.grid_2d(16)
+        self.assertEqual(len(graph.get_vertices()), 16)
+        self.assertTrue(graph.is_bipartite())
+        self.assertEqual(len(graph.find_connected_components()), 1)
+
+
+class TestRun(unittest.TestCase):
+
+    def test_every_algorithm_is_recorded(self):
+        results = run([30], ['erdos_renyi'], track_memory=True)
+
+        algorithms = {(record['graph'], record['algorithm']) for record in results}
+        self.assertIn(('Graph', 'find_shortest_path'), algorithms)
+        self.assertIn(('WeightedGraph', 'floyd_warshall'), algorithms)
+        for record in results:
+            self.assertTrue('seconds' in record or 'error' in record)
+
+
+if __name__ == '__main__':
+    unittest.main()
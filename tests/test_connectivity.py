@@ -0,0 +1,69 @@
+import unittest
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+
+
+class TestComponentTracking(unittest.TestCase):
+
+    def test_tracks_components_as_edges_arrive(self):
+        graph = Graph(is_directed=False)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('A','B')
+        graph.enable_component_tracking()
+
+        graph.add_vertex('C')
+        graph.add_vertex('D')
+        self.assertEqual(graph.component_count(), 3)
+        self.assertTrue(graph.same_component('A', 'B'))
+        self.assertFalse(graph.same_component('A', 'C'))
+
+        graph.add_edge('C','D')
+        graph.add_edge('D','B')
+        self.assertEqual(graph.component_count(), 1)
+        self.assertEqual(graph.component_size('A'), 4)
+        self.assertEqual(len(graph.find_connected_components()), graph.component_count())
+
+    def test_directed_graph_uses_weak_components(self):
+        graph = Graph(is_directed=True)
+        graph.enable_component_tracking()
+        for vertex in 'ABC':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('C','B')
+
+        self.assertTrue(graph.same_component('A', 'C'))
+
+    def test_readding_vertex_splits_components(self):
+        graph = Graph(is_directed=True)
+        graph.enable_component_tracking()
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('A','B')
+        self.assertEqual(graph.component_count(), 1)
+
+        # Re-adding A drops its edges, so the components are rebuilt
+        graph.add_vertex('A')
+        self.assertEqual(graph.component_count(), 2)
+
+    def test_weighted_graph(self):
+        graph = WeightedGraph(is_directed=False)
+        graph.enable_component_tracking()
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B', 1)
+        graph.add_edge('C','D', 1)
+
+        self.assertEqual(graph.component_count(), 2)
+        self.assertEqual(graph.component_size('C'), 2)
+        self.assertFalse(graph.same_component('B', 'C'))
+
+    def test_tracking_not_enabled(self):
+        graph = Graph()
+        graph.add_vertex('A')
+        with self.assertRaises(ValueError):
+            graph.component_count()
+
+
+if __name__ == '__main__':
+    unittest.main()
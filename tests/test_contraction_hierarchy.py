@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from benchmarks.generators import erdos_renyi
+from graphs.contraction_hierarchy import ContractionHierarchy
+
+
+def path_weight(graph, path):
+    return sum(graph.get_vertex(start_id).neighbors_dict[end_id][1]
+        for start_id, end_id in zip(path, path[1:]))
+
+
+class TestContractionHierarchy(unittest.TestCase):
+
+    def test_matches_dijkstra(self):
+        for is_directed, seed in ((True, 1), (False, 2), (True, 3)):
+            graph = erdos_renyi(60, average_degree=5, seed=seed,
+                is_directed=is_directed, weighted=True, max_weight=20)
+            hierarchy = ContractionHierarchy.build(graph)
+            for start_id in graph.vertex_dict:
+                distances, _ = graph.shortest_path_tree(start_id)
+                for target_id in graph.vertex_dict:
+                    expected = distances.get(target_id, float('inf'))
+                    distance, path = hierarchy.find_shortest_path(start_id,
+                        target_id, return_path=True)
+                    self.assertEqual(distance, expected)
+                    if path is None:
+                        self.assertEqual(expected, float('inf'))
+                    else:
+                        self.assertEqual(path[0], start_id)
+                        self.assertEqual(path[-1], target_id)
+                        self.assertEqual(path_weight(graph, path), expected)
+
+    def test_missing_vertex(self):
+        hierarchy = ContractionHierarchy.build(erdos_renyi(5, seed=0,
+            is_directed=True, weighted=True))
+        with self.assertRaises(KeyError):
+            hierarchy.find_shortest_path('0', 'Z')
+
+    def test_save_and_load(self):
+        graph = erdos_renyi(50, average_degree=5, seed=4, is_directed=True,
+            weighted=True, max_weight=20)
+        hierarchy = ContractionHierarchy.build(graph, witness_limit=5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.ch')
+            hierarchy.save(filename)
+            loaded = ContractionHierarchy.load(filename)
+
+        self.assertEqual(loaded.num_shortcuts(), hierarchy.num_shortcuts())
+        for target_id in graph.vertex_dict:
+            self.assertEqual(loaded.find_shortest_path('0', target_id, return_path=True),
+                hierarchy.find_shortest_path('0', target_id, return_path=True))
+
+    def test_load_truncated(self):
+        hierarchy = ContractionHierarchy.build(erdos_renyi(10, seed=5,
+            is_directed=True, weighted=True))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.ch')
+            hierarchy.save(filename)
+            with open(filename, 'rb') as hierarchy_file:
+                data = hierarchy_file.read()
+            with open(filename, 'wb') as hierarchy_file:
+                hierarchy_file.write(data[:-1])
+            with self.assertRaisesRegex(ValueError, 'truncated'):
+                ContractionHierarchy.load(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
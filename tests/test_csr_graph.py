@@ -0,0 +1,121 @@
+import unittest
+from graphs.graph import Graph
+from util.file_reader import read_graph_from_file
+
+
+class TestCSRGraph(unittest.TestCase):
+
+    def make_dag(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('B')
+        graph.add_vertex('C')
+        graph.add_vertex('D')
+        graph.add_vertex('E')
+        graph.add_vertex('A')
+        graph.add_edge('A','C')
+        graph.add_edge('B','D')
+        graph.add_edge('C','D')
+        graph.add_edge('D','E')
+        graph.add_edge('A','B')
+        return graph
+
+    def test_freeze_keeps_vertices_and_edges(self):
+        graph = self.make_dag()
+        frozen = graph.freeze()
+
+        self.assertEqual(frozen.get_vertices(), graph.get_vertices())
+        self.assertEqual(frozen.num_edges(), 5)
+        for vertex in graph.get_vertices():
+            self.assertEqual(frozen.get_neighbors(vertex), graph.get_neighbors(vertex))
+        self.assertTrue(frozen.contains_edge('A', 'C'))
+        self.assertFalse(frozen.contains_edge('C', 'A'))
+
+    def test_freeze_undirected_stores_both_directions(self):
+        filename = 'test_files/graph_small_undirected.txt'
+        frozen = read_graph_from_file(filename).freeze()
+
+        self.assertEqual(len(frozen.get_neighbors('2')), 2)
+        self.assertEqual(len(frozen.get_neighbors('4')), 2)
+
+    def test_find_shortest_path(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        frozen = read_graph_from_file(filename).freeze()
+
+        self.assertEqual(len(frozen.find_shortest_path('A', 'F')), 4)
+        self.assertIsNone(self.make_dag().freeze().find_shortest_path('E', 'A'))
+
+    def test_find_vertices_n_away(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        frozen = read_graph_from_file(filename).freeze()
+
+        self.assertEqual(sorted(frozen.find_vertices_n_away('A', 1)), ['B','C'])
+        self.assertEqual(sorted(frozen.find_vertices_n_away('A', 2)), ['D','E'])
+        self.assertEqual(frozen.find_vertices_n_away('A', 3), ['F'])
+        self.assertEqual(frozen.find_vertices_n_away('A', -1), [])
+
+    def test_find_vertices_n_away_batch(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        graph = read_graph_from_file(filename)
+        frozen = graph.freeze()
+
+        results = frozen.find_vertices_n_away_batch(['A', 'F', 'A'], [0, 1, 2])
+        self.assertEqual(sorted(results), ['A', 'F'])
+        for start_id in results:
+            for distance, vertices in results[start_id].items():
+                self.assertEqual(sorted(vertices),
+                    sorted(graph.find_vertices_n_away(start_id, distance)))
+        with self.assertRaises(KeyError):
+            frozen.find_vertices_n_away_batch(['Z'], 1)
+        with self.assertRaises(ValueError):
+            frozen.find_vertices_n_away_batch(['A'], -1)
+
+    def test_shortest_path_tree_unweighted(self):
+        distances, parents = self.make_dag().freeze().shortest_path_tree('A')
+
+        self.assertEqual(distances, {'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 3})
+        self.assertIsNone(parents['A'])
+        self.assertIn(parents['D'], ('B', 'C'))
+        self.assertEqual(parents['E'], 'D')
+
+    def test_shortest_path_tree_stops_at_targets(self):
+        frozen = self.make_dag().freeze()
+
+        distances, parents = frozen.shortest_path_tree('A', ['B', 'C'])
+        self.assertNotIn('E', distances)
+        self.assertEqual(distances['B'], 1)
+        self.assertEqual(distances['C'], 1)
+        self.assertEqual(frozen.shortest_path_tree('A', ['A'])[0], {'A': 0})
+
+        graph = read_graph_from_file(['D', 'A,B,C,D', '(A,B,1)', '(B,C,1)',
+            '(A,C,5)', '(C,D,1)'])
+        distances, parents = graph.freeze().shortest_path_tree('A', ['C'])
+        self.assertEqual(distances['C'], 2)
+        self.assertEqual(parents['C'], 'B')
+        self.assertNotIn('D', distances)
+
+    def test_find_connected_components(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCDEF':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('C','B')
+        graph.add_edge('D','E')
+
+        components = [sorted(comp) for comp in graph.freeze().find_connected_components()]
+        self.assertCountEqual(components, [['A', 'B', 'C'], ['D', 'E'], ['F']])
+
+    def test_topological_sort(self):
+        possible_sorts = [
+            ['A', 'B', 'C', 'D', 'E'],
+            ['A', 'C', 'B', 'D', 'E']
+        ]
+        self.assertIn(self.make_dag().freeze().topological_sort(), possible_sorts)
+
+        graph = self.make_dag()
+        graph.add_edge('E', 'A')
+        with self.assertRaises(ValueError):
+            graph.freeze().topological_sort()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from graphs.disjoint_set import DisjointSet
+
+
+class TestDisjointSet(unittest.TestCase):
+
+    def test_union_and_find(self):
+        sets = DisjointSet('ABCDE')
+        self.assertEqual(len(sets), 5)
+        self.assertEqual(sets.num_sets, 5)
+
+        self.assertTrue(sets.union('A', 'B'))
+        self.assertTrue(sets.union('C', 'D'))
+        self.assertTrue(sets.union('B', 'D'))
+        self.assertFalse(sets.union('A', 'C'))
+
+        self.assertTrue(sets.connected('A', 'D'))
+        self.assertFalse(sets.connected('A', 'E'))
+        self.assertEqual(sets.num_sets, 2)
+        self.assertEqual(sets.set_size('C'), 4)
+        self.assertEqual(sets.set_size('E'), 1)
+
+    def test_add(self):
+        sets = DisjointSet()
+        self.assertTrue(sets.add('A'))
+        self.assertFalse(sets.add('A'))
+        self.assertIn('A', sets)
+        self.assertNotIn('B', sets)
+
+    def test_long_chain_does_not_recurse(self):
+        """A chain longer than the recursion limit is still found iteratively."""
+        size = 20000
+        sets = DisjointSet(range(size))
+        # Build a degenerate chain by hand, then check find flattens it
+        for i in range(1, size):
+            sets.parent_map[i] = i - 1
+
+        self.assertEqual(sets.find(size - 1), 0)
+        self.assertEqual(sets.parent_map[size - 1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
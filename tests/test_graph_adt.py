@@ -1,5 +1,7 @@
+import io
 import unittest
 from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
 from util.file_reader import read_graph_from_file
 
 
@@ -37,6 +39,94 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(len(graph.get_neighbors('B')), 2)
         self.assertEqual(len(graph.get_neighbors('C')), 2)
 
+    def test_add_edge_to_missing_vertex(self):
+        """A failed add_edge leaves the graph unchanged."""
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.enable_component_tracking()
+
+        with self.assertRaises(KeyError):
+            graph.add_edge('A', 'Z')
+        with self.assertRaises(KeyError):
+            graph.add_edge('Z', 'A')
+        self.assertEqual(graph.get_neighbors('A'), [])
+        self.assertEqual(graph.find_connected_components(), [['A']])
+        self.assertEqual(graph.component_count(), 1)
+        self.assertEqual(len(graph.freeze()), 1)
+
+    def test_incoming_neighbors(self):
+        """Track the vertices with an edge into each vertex."""
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_vertex('C')
+        graph.add_edge('A','C')
+        graph.add_edge('B','C')
+
+        self.assertEqual(graph.get_incoming_neighbors('C'), ['A', 'B'])
+        self.assertEqual(graph.get_incoming_neighbors('A'), [])
+
+        # Re-adding a vertex clears its outgoing edges from the reverse index
+        graph.add_vertex('A')
+        self.assertEqual(graph.get_incoming_neighbors('C'), ['B'])
+
+    def test_undirected_neighbors_use_both_directions(self):
+        graph = Graph(is_directed=False)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_vertex('C')
+        graph.add_edge('A','B')
+        graph.add_edge('C','B')
+
+        self.assertEqual(sorted(graph.get_neighbors('B')), ['A', 'C'])
+        self.assertEqual(graph.get_neighbors('C'), ['B'])
+
+    def test_bulk_add_skips_duplicates(self):
+        for adjacency in ('list', 'dict'):
+            graph = Graph(is_directed=False, adjacency=adjacency)
+            self.assertEqual(graph.add_vertices_from(['A', 'B', 'C', 'A']), 3)
+            graph.add_edge('A','B')
+            version = graph.version
+
+            added = graph.add_edges_from([('A','B'), ('B','A'), ('B','C'), ('B','C')])
+            self.assertEqual(added, 1)
+            self.assertEqual(graph.version, version + 1)
+            self.assertEqual(sorted(graph.get_neighbors('B')), ['A', 'C'])
+            self.assertTrue(graph.contains_edge('C', 'B'))
+            self.assertFalse(graph.contains_edge('A', 'C'))
+
+            with self.assertRaises(KeyError):
+                graph.add_edges_from([('A', 'Z')])
+
+    def test_dict_adjacency(self):
+        graph = Graph(is_directed=True, adjacency='dict')
+        graph.add_vertices_from('ABC')
+        graph.add_edge('A','B')
+        graph.add_edge('A','B')
+        graph.add_edge('A','C')
+
+        self.assertEqual(graph.get_neighbors('A'), ['B', 'C'])
+        self.assertEqual(graph.get_incoming_neighbors('B'), ['A'])
+        self.assertFalse(graph.contains_edge('B', 'A'))
+        self.assertEqual(graph.find_shortest_path('A', 'C'), ['A', 'C'])
+
+        with self.assertRaises(ValueError):
+            Graph(adjacency='set')
+
+    def test_remove_edge(self):
+        for adjacency in ('list', 'dict'):
+            graph = Graph(is_directed=False, adjacency=adjacency)
+            graph.add_vertices_from('ABC')
+            graph.add_edges_from([('A','B'), ('B','C')])
+            graph.enable_component_tracking()
+
+            graph.remove_edge('B', 'A')
+            self.assertFalse(graph.contains_edge('A', 'B'))
+            self.assertEqual(graph.get_neighbors('A'), [])
+            self.assertEqual(graph.component_count(), 2)
+            with self.assertRaises(KeyError):
+                graph.remove_edge('A', 'B')
+
 class TestReadGraphFromFile(unittest.TestCase):
     def test_read_directed_graph_from_file(self):
         filename = 'test_files/graph_small_directed.txt'
@@ -66,6 +156,36 @@ class TestReadGraphFromFile(unittest.TestCase):
         with self.assertRaises(ValueError) as error:
             graph = read_graph_from_file(filename)
 
+    def test_read_multi_character_ids_from_file_object(self):
+        graph_file = io.StringIO('D\nhome,work,gym\n(home,work)\n\n(work,gym)\n')
+        graph = read_graph_from_file(graph_file)
+
+        self.assertIsInstance(graph, Graph)
+        self.assertEqual(graph.get_vertices(), ['home', 'work', 'gym'])
+        self.assertEqual(graph.get_neighbors('home'), ['work'])
+        self.assertEqual(graph.get_neighbors('work'), ['gym'])
+
+    def test_read_weighted_graph(self):
+        graph_file = io.StringIO('G\nA,B,C\n(A,B,4)\n(B,C,2.5)\n')
+        graph = read_graph_from_file(graph_file)
+
+        self.assertIsInstance(graph, WeightedGraph)
+        self.assertEqual(graph.find_shortest_path('A', 'C'), 6.5)
+
+    def test_improper_edge(self):
+        with self.assertRaises(ValueError):
+            read_graph_from_file(io.StringIO('G\nA,B\n(A,B)\n(A,B,1)\n'))
+        with self.assertRaises(ValueError):
+            read_graph_from_file(io.StringIO('G\nA,B\nA B\n'))
+
+    def test_edge_to_unknown_vertex(self):
+        with self.assertRaises(ValueError):
+            read_graph_from_file(io.StringIO('G\nA,B\n(A,B)\n(B,C)\n'))
+
+    def test_weighted_edge_to_unknown_vertex(self):
+        with self.assertRaises(ValueError):
+            read_graph_from_file(io.StringIO('G\nA,B\n(A,B,1)\n(C,A,2)\n'))
+
     def test_find_shortest_path(self):
         filename = 'test_files/graph_medium_undirected.txt'
         graph = read_graph_from_file(filename)
@@ -87,6 +207,18 @@ class TestReadGraphFromFile(unittest.TestCase):
         vertices_3_away = graph.find_vertices_n_away('A', 3)
         self.assertEqual(vertices_3_away, ['F'])
 
+    def test_get_vertices_n_away_batch(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        graph = read_graph_from_file(filename)
+
+        results = graph.find_vertices_n_away_batch(['A', 'F', 'D'], [0, 1, 2, 3])
+        for start_id in ['A', 'F', 'D']:
+            for distance in [0, 1, 2, 3]:
+                self.assertEqual(sorted(results[start_id][distance]),
+                    sorted(graph.find_vertices_n_away(start_id, distance)))
+
+        self.assertEqual(graph.find_vertices_n_away_batch(['A'], 3), {'A': {3: ['F']}})
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 
+import random
 import unittest
 from graphs.graph import Graph
 
@@ -73,6 +74,134 @@ class TestConnectedComponents(unittest.TestCase):
         self.assertCountEqual(expected_components, actual_components)
 
 
+    def test_get_connected_components_directed(self):
+        """Directed graphs are split into weakly connected components."""
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCDE':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('C','B')
+        graph.add_edge('E','D')
+
+        actual_components = [sorted(comp) for comp in graph.find_connected_components()]
+        self.assertCountEqual([['A', 'B', 'C'], ['D', 'E']], actual_components)
+
+
+class TestStronglyConnectedComponents(unittest.TestCase):
+    def test_get_strongly_connected_components(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCDEFG':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+        graph.add_edge('C','A')
+        graph.add_edge('C','D')
+        graph.add_edge('D','E')
+        graph.add_edge('E','D')
+        graph.add_edge('E','F')
+
+        expected_components = [['A', 'B', 'C'], ['D', 'E'], ['F'], ['G']]
+        actual_components = [sorted(comp) for comp in graph.find_strongly_connected_components()]
+        self.assertCountEqual(expected_components, actual_components)
+
+    def test_long_chain(self):
+        """A path much deeper than the recursion limit is handled."""
+        graph = Graph(is_directed=True)
+        size = 5000
+        for i in range(size):
+            graph.add_vertex(i)
+        for i in range(size - 1):
+            graph.add_edge(i, i + 1)
+        graph.add_edge(size - 1, 0)
+
+        components = graph.find_strongly_connected_components()
+        self.assertEqual(len(components), 1)
+        self.assertEqual(len(components[0]), size)
+
+
+class TestFindShortestPath(unittest.TestCase):
+    def make_random_graph(self, is_directed, seed):
+        rng = random.Random(seed)
+        graph = Graph(is_directed=is_directed)
+        for i in range(60):
+            graph.add_vertex(str(i))
+        for _ in range(120):
+            graph.add_edge(str(rng.randrange(60)), str(rng.randrange(60)))
+        return graph
+
+    def assertValidPath(self, graph, path, start_id, target_id):
+        self.assertEqual(path[0], start_id)
+        self.assertEqual(path[-1], target_id)
+        for vertex, next_vertex in zip(path, path[1:]):
+            self.assertIn(next_vertex, graph.get_neighbors(vertex))
+
+    def test_bidirectional_matches_bfs(self):
+        for is_directed in (True, False):
+            for seed in range(5):
+                graph = self.make_random_graph(is_directed, seed)
+                for start_id, target_id in [('0', '1'), ('5', '42'), ('17', '17')]:
+                    path = graph.find_shortest_path(start_id, target_id)
+                    bidirectional_path = graph.find_shortest_path(
+                        start_id, target_id, bidirectional=True)
+                    if path is None:
+                        self.assertIsNone(bidirectional_path)
+                        continue
+                    self.assertValidPath(graph, path, start_id, target_id)
+                    self.assertValidPath(graph, bidirectional_path, start_id, target_id)
+                    self.assertEqual(len(path), len(bidirectional_path))
+
+    def test_unreachable_target(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('B','A')
+
+        self.assertIsNone(graph.find_shortest_path('A', 'B'))
+        self.assertIsNone(graph.find_shortest_path('A', 'B', bidirectional=True))
+        self.assertEqual(graph.find_shortest_path('B', 'A', bidirectional=True), ['B', 'A'])
+        with self.assertRaises(KeyError):
+            graph.find_shortest_path('A', 'Z')
+
+
+class TestLazyTraversals(unittest.TestCase):
+    def make_tree(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCDEF':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('A','C')
+        graph.add_edge('B','D')
+        graph.add_edge('D','E')
+        graph.add_edge('C','F')
+        return graph
+
+    def test_iter_bfs(self):
+        graph = self.make_tree()
+
+        self.assertEqual(list(graph.iter_bfs('A')), ['A', 'B', 'C', 'D', 'F', 'E'])
+        self.assertEqual(list(graph.iter_bfs('A', max_depth=1)), ['A', 'B', 'C'])
+        self.assertEqual(list(graph.iter_bfs('B', with_info=True)),
+            [('B', 0, None), ('D', 1, 'B'), ('E', 2, 'D')])
+
+    def test_iter_dfs(self):
+        graph = self.make_tree()
+
+        self.assertEqual(list(graph.iter_dfs('A')), ['A', 'B', 'D', 'E', 'C', 'F'])
+        self.assertEqual(list(graph.iter_dfs('A', max_depth=2)), ['A', 'B', 'D', 'C', 'F'])
+        self.assertEqual(list(graph.iter_dfs('A', max_depth=0)), ['A'])
+        self.assertEqual(list(graph.iter_dfs('C', with_info=True)),
+            [('C', 0, None), ('F', 1, 'C')])
+
+    def test_traversal_stops_early(self):
+        graph = self.make_tree()
+        traversal = graph.iter_bfs('A')
+
+        self.assertEqual(next(traversal), 'A')
+        self.assertEqual(next(traversal), 'B')
+        with self.assertRaises(KeyError):
+            graph.iter_dfs('Z')
+
+
 class TestFindPathDfs(unittest.TestCase):
     def test_find_path_dfs(self):
         graph = Graph(is_directed=True)
@@ -124,6 +253,46 @@ class TestContainsCycle(unittest.TestCase):
 
         self.assertFalse(graph.contains_cycle())
 
+    def test_cycle_not_reachable_from_first_vertex(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_vertex('C')
+        graph.add_vertex('D')
+        graph.add_edge('A','B')
+        graph.add_edge('C','D')
+        graph.add_edge('D','C')
+
+        self.assertTrue(graph.contains_cycle())
+        self.assertIn(graph.find_cycle(), [['C', 'D'], ['D', 'C']])
+
+    def test_find_cycle(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+        graph.add_edge('C','D')
+        graph.add_edge('D','B')
+
+        self.assertEqual(graph.find_cycle(), ['B', 'C', 'D'])
+
+        graph.add_vertex('B')
+        self.assertIsNone(graph.find_cycle())
+
+    def test_find_cycle_undirected(self):
+        graph = Graph(is_directed=False)
+        for vertex in 'ABC':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+
+        self.assertIsNone(graph.find_cycle())
+        self.assertFalse(graph.contains_cycle())
+
+        graph.add_edge('C','A')
+        self.assertCountEqual(graph.find_cycle(), ['A', 'B', 'C'])
+
 
 class TestTopologicalSort(unittest.TestCase):
     def test_topological_sort(self):
@@ -147,6 +316,39 @@ class TestTopologicalSort(unittest.TestCase):
 
         self.assertIn(topo_sort, possible_sorts)
 
+    def test_topological_sort_with_cycle(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('A','B')
+        graph.add_edge('B','A')
+
+        with self.assertRaises(ValueError):
+            graph.topological_sort()
+
+    def test_topological_sort_undirected(self):
+        graph = Graph(is_directed=False)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('A','B')
+
+        with self.assertRaises(ValueError):
+            graph.topological_sort()
+        with self.assertRaises(ValueError):
+            graph.freeze().topological_sort()
+
+    def test_topological_sort_long_chain(self):
+        """A DAG much deeper than the recursion limit can be sorted."""
+        graph = Graph(is_directed=True)
+        size = 5000
+        for i in reversed(range(size)):
+            graph.add_vertex(i)
+        for i in range(size - 1):
+            graph.add_edge(i, i + 1)
+
+        self.assertFalse(graph.contains_cycle())
+        self.assertEqual(graph.topological_sort(), list(range(size)))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
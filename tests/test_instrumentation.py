@@ -0,0 +1,72 @@
+import unittest
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+from util.file_reader import read_graph_from_file
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        self.assertIsNone(graph.instrumentation)
+        self.assertEqual(len(graph.find_shortest_path('A', 'F')), 4)
+
+    def test_bfs_counters(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('A','C')
+        graph.add_edge('B','D')
+        graph.add_edge('C','D')
+        instrumentation = graph.enable_instrumentation()
+
+        graph.find_vertices_n_away('A', 5)
+        stats = instrumentation.calls[-1]
+        self.assertEqual(stats.name, 'find_vertices_n_away')
+        self.assertEqual(stats.vertices_dequeued, 4)
+        self.assertEqual(stats.edges_scanned, 4)
+        self.assertEqual(stats.peak_frontier, 2)
+        self.assertGreaterEqual(stats.seconds, 0)
+
+        list(graph.iter_bfs('A'))
+        self.assertEqual(instrumentation.calls[-1].name, 'iter_bfs')
+        self.assertEqual(instrumentation.calls[-1].vertices_dequeued, 4)
+
+    def test_nested_calls_and_totals(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_edge('A','B')
+        seen = []
+        instrumentation = graph.enable_instrumentation(callback=seen.append)
+
+        graph.contains_cycle()
+        graph.contains_cycle()
+        self.assertEqual([stats.name for stats in seen], ['find_cycle', 'find_cycle'])
+        self.assertEqual(instrumentation.totals['find_cycle']['calls'], 2)
+        self.assertEqual(instrumentation.totals['find_cycle']['vertices_dequeued'], 4)
+
+        graph.disable_instrumentation()
+        graph.contains_cycle()
+        self.assertEqual(len(seen), 2)
+
+    def test_dijkstra_counters(self):
+        graph = WeightedGraph(is_directed=True)
+        for vertex in 'ABC':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','C', 5)
+        graph.add_edge('A','B', 1)
+        graph.add_edge('B','C', 1)
+        instrumentation = graph.enable_instrumentation()
+
+        graph.find_shortest_path('A', 'C')
+        stats = instrumentation.calls[-1].as_dict()
+        self.assertEqual(stats['name'], 'find_shortest_path')
+        self.assertEqual(stats['edges_relaxed'], 3)
+        self.assertEqual(stats['heap_pushes'], 4)
+        self.assertEqual(stats['vertices_dequeued'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import random
+import tempfile
+import unittest
+from benchmarks.generators import erdos_renyi
+from graphs.landmarks import LandmarkOracle
+
+
+class TestLandmarkOracle(unittest.TestCase):
+
+    def test_bounds_hold_for_every_pair(self):
+        for is_directed in (True, False):
+            graph = erdos_renyi(40, average_degree=4.5, seed=3,
+                is_directed=is_directed, weighted=True, max_weight=20)
+            oracle = LandmarkOracle.build(graph, num_landmarks=4)
+            self.assertEqual(len(oracle.get_landmarks()), 4)
+
+            for start_id in graph.vertex_dict:
+                distances, _ = graph.shortest_path_tree(start_id)
+                for target_id in graph.vertex_dict:
+                    distance = distances.get(target_id, float('inf'))
+                    self.assertLessEqual(oracle.lower_bound(start_id, target_id), distance)
+                    self.assertGreaterEqual(oracle.upper_bound(start_id, target_id), distance)
+
+    def test_astar_with_landmarks(self):
+        graph = erdos_renyi(200, average_degree=6, seed=7, is_directed=True,
+            weighted=True, max_weight=20)
+        oracle = LandmarkOracle.build(graph, num_landmarks=8)
+        rng = random.Random(1)
+        for _ in range(20):
+            start_id, target_id = str(rng.randrange(200)), str(rng.randrange(200))
+            cost, path = graph.astar(start_id, target_id, heuristic=oracle.lower_bound)
+            self.assertEqual(cost, graph.find_shortest_path(start_id, target_id))
+
+    def test_save_and_load(self):
+        graph = erdos_renyi(30, seed=5, is_directed=True, weighted=True,
+            max_weight=20)
+        oracle = LandmarkOracle.build(graph, landmark_ids=['0', '7'])
+        self.assertEqual(oracle.get_landmarks(), ['0', '7'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.alt')
+            oracle.save(filename)
+            loaded = LandmarkOracle.load(filename)
+
+        self.assertEqual(loaded.get_landmarks(), ['0', '7'])
+        self.assertEqual(loaded.forward, oracle.forward)
+        self.assertEqual(loaded.backward, oracle.backward)
+        self.assertEqual(loaded.lower_bound('3', '12'), oracle.lower_bound('3', '12'))
+
+    def test_load_truncated(self):
+        oracle = LandmarkOracle.build(erdos_renyi(10, seed=5, weighted=True))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.alt')
+            oracle.save(filename)
+            with open(filename, 'rb') as landmark_file:
+                data = landmark_file.read()
+            with open(filename, 'wb') as landmark_file:
+                landmark_file.write(data[:-1])
+            with self.assertRaisesRegex(ValueError, 'truncated'):
+                LandmarkOracle.load(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
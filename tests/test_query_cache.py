@@ -0,0 +1,105 @@
+import unittest
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def make_graph(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+        return graph
+
+    def test_disabled_by_default(self):
+        graph = self.make_graph()
+        self.assertIsNone(graph.cache_info())
+        self.assertEqual(graph.find_shortest_path('A', 'C'), ['A', 'B', 'C'])
+
+    def test_hits_and_misses(self):
+        graph = self.make_graph()
+        graph.enable_cache()
+
+        first = graph.find_shortest_path('A', 'C')
+        second = graph.find_shortest_path('A', 'C')
+        self.assertEqual(first, second)
+        graph.find_shortest_path('A', 'C', bidirectional=True)
+        graph.find_vertices_n_away('A', 2)
+
+        self.assertEqual(graph.cache_info(),
+            {'hits': 1, 'misses': 3, 'size': 3, 'maxsize': 128})
+
+    def test_mutation_invalidates(self):
+        graph = self.make_graph()
+        graph.enable_cache()
+
+        self.assertIsNone(graph.find_shortest_path('A', 'D'))
+        graph.add_edge('C','D')
+        self.assertEqual(graph.find_shortest_path('A', 'D'), ['A', 'B', 'C', 'D'])
+        self.assertEqual(graph.cache_info()['hits'], 0)
+
+    def test_changing_a_result_does_not_change_the_cache(self):
+        graph = self.make_graph()
+        graph.enable_cache()
+
+        graph.find_shortest_path('A', 'C').append('X')
+        self.assertEqual(graph.find_shortest_path('A', 'C'), ['A', 'B', 'C'])
+        graph.find_shortest_path('A', 'C').append('X')
+        self.assertEqual(graph.find_shortest_path('A', 'C'), ['A', 'B', 'C'])
+        graph.find_vertices_n_away('A', 1).clear()
+        self.assertEqual(graph.find_vertices_n_away('A', 1), ['B'])
+
+        weighted = WeightedGraph(is_directed=True)
+        for vertex in 'AB':
+            weighted.add_vertex(vertex)
+        weighted.add_edge('A','B', 1)
+        weighted.enable_cache()
+
+        distances, parents = weighted.shortest_path_tree('A')
+        distances['B'] = 99
+        del parents['B']
+        self.assertEqual(weighted.shortest_path_tree('A'), ({'A': 0, 'B': 1}, {'A': None, 'B': 'A'}))
+        weighted.minimum_spanning_tree_kruskal().append(('B', 'A', 5))
+        self.assertEqual(weighted.minimum_spanning_tree_kruskal(), [('A', 'B', 1)])
+        weighted.minimum_spanning_tree_prim(return_edges=True)[0].clear()
+        self.assertEqual(weighted.minimum_spanning_tree_prim(return_edges=True), ([('A', 'B', 1)], 1))
+        self.assertEqual(weighted.cache_info()['hits'], 3)
+
+    def test_least_recently_used_is_evicted(self):
+        graph = self.make_graph()
+        graph.enable_cache(maxsize=2)
+
+        graph.find_vertices_n_away('A', 1)
+        graph.find_vertices_n_away('A', 2)
+        graph.find_vertices_n_away('A', 1)
+        graph.find_vertices_n_away('A', 3)
+        graph.find_vertices_n_away('A', 1)
+        graph.find_vertices_n_away('A', 2)
+
+        self.assertEqual(graph.cache_info(),
+            {'hits': 2, 'misses': 4, 'size': 2, 'maxsize': 2})
+
+    def test_weighted_graph(self):
+        graph = WeightedGraph(is_directed=False)
+        for vertex in 'ABC':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B', 1)
+        graph.add_edge('B','C', 2)
+        graph.enable_cache()
+
+        self.assertEqual(graph.minimum_spanning_tree_prim(), 3)
+        self.assertEqual(graph.minimum_spanning_tree_prim(), 3)
+        self.assertEqual(graph.find_shortest_path('A', 'C'), 3)
+        graph.add_edge('A','C', 1)
+        self.assertEqual(graph.find_shortest_path('A', 'C'), 1)
+        self.assertEqual(graph.minimum_spanning_tree_prim(), 2)
+        self.assertEqual(graph.cache_info()['hits'], 1)
+
+        graph.disable_cache()
+        self.assertIsNone(graph.cache_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import server as server_module
+from server import GraphServer, _load_worker, _run_batch, is_snapshot
+from util.file_reader import read_graph_from_file
+from util.snapshot import save_snapshot
+
+
+class TestGraphServer(unittest.IsolatedAsyncioTestCase):
+
+    async def query(self, filename, requests):
+        """Send `requests` down one connection and return the responses by id."""
+        graph_server = GraphServer(filename, max_workers=1)
+        server = await graph_server.start(port=0)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            for request in requests:
+                writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            writer.write(b'not json\n')
+            await writer.drain()
+            writer.write_eof()
+
+            responses = {}
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                responses[response['id']] = response
+            writer.close()
+            return responses
+        finally:
+            server.close()
+            await server.wait_closed()
+            graph_server.close()
+
+    async def test_unweighted_queries(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        responses = await self.query(filename, [
+            {'id': 1, 'op': 'shortest_path', 'start': 'A', 'target': 'F'},
+            {'id': 2, 'op': 'shortest_path', 'start': 'A', 'target': 'A'},
+            {'id': 3, 'op': 'k_hop', 'start': 'A', 'k': 2},
+            {'id': 4, 'op': 'k_hop', 'start': 'F', 'k': 1},
+            {'id': 5, 'op': 'components'},
+            {'id': 6, 'op': 'mst'},
+            {'id': 7, 'op': 'k_hop', 'start': 'Z', 'k': 1},
+            {'id': 8, 'op': 'teleport'},
+        ])
+
+        self.assertEqual(responses[1]['result']['distance'], 3)
+        self.assertEqual(len(responses[1]['result']['path']), 4)
+        self.assertEqual(responses[2]['result'], {'distance': 0, 'path': ['A']})
+        self.assertEqual(sorted(responses[3]['result']), ['D', 'E'])
+        self.assertEqual(sorted(responses[4]['result']), ['D', 'E'])
+        self.assertEqual(len(responses[5]['result']), 1)
+        self.assertIn('error', responses[6])
+        self.assertIn('error', responses[7])
+        self.assertIn('error', responses[8])
+        self.assertIn('error', responses[None])
+
+    async def test_malformed_fields(self):
+        filename = 'test_files/graph_medium_undirected.txt'
+        responses = await self.query(filename, [
+            {'id': 1, 'op': 'shortest_path', 'start': ['A'], 'target': 'F'},
+            {'id': 2, 'op': 'shortest_path', 'start': 'A', 'target': {'F': 1}},
+            {'id': 3, 'op': 'k_hop', 'start': 'A', 'k': True},
+            {'id': 4, 'op': ['k_hop']},
+            {'id': 5, 'op': 'shortest_path', 'start': 'A', 'target': 'F'},
+            {'id': 6, 'op': 'k_hop', 'start': 'A', 'k': 2},
+        ])
+
+        for request_id in range(1, 5):
+            self.assertIn('error', responses[request_id])
+        self.assertEqual(responses[5]['result']['distance'], 3)
+        self.assertEqual(sorted(responses[6]['result']), ['D', 'E'])
+
+    def test_worker_serves_snapshot_without_thawing(self):
+        graph = read_graph_from_file(['G', 'A,B,C', '(A,B,4)', '(B,C,1)'])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.snapshot')
+            save_snapshot(graph, filename)
+            _load_worker(filename)
+            answers = _run_batch('shortest_path',
+                [{'op': 'shortest_path', 'start': 'A', 'target': 'C'}])
+            self.assertEqual(answers, [(None, {'distance': 5, 'path': ['A', 'B', 'C']})])
+            self.assertIsNone(server_module._worker_thawed)
+
+            answers = _run_batch('mst', [{'op': 'mst'}])
+            self.assertEqual(answers[0][1]['weight'], 5)
+            self.assertIsNotNone(server_module._worker_thawed)
+            # Drop the mapping before its directory is removed.
+            server_module._worker_graph = server_module._worker_thawed = None
+
+    def test_bad_graph_fails_at_startup(self):
+        with self.assertRaises(OSError):
+            GraphServer('test_files/no_such_graph.txt', max_workers=1)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.txt')
+            with open(filename, 'w') as graph_file:
+                graph_file.write('X\nA,B\n')
+            with self.assertRaises(ValueError):
+                GraphServer(filename, max_workers=1)
+
+    def test_graph_file_is_served_from_one_snapshot(self):
+        graph_server = GraphServer('test_files/graph_medium_undirected.txt',
+            max_workers=1)
+        snapshot_dir = graph_server.snapshot_dir.name
+        self.assertTrue(is_snapshot(os.path.join(snapshot_dir, 'graph.snapshot')))
+        graph_server.close()
+        self.assertFalse(os.path.exists(snapshot_dir))
+
+    async def test_weighted_snapshot(self):
+        graph = read_graph_from_file(['G', 'A,B,C,D', '(A,B,4)', '(B,C,1)', '(A,C,7)'])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.snapshot')
+            save_snapshot(graph, filename)
+            responses = await self.query(filename, [
+                {'id': 1, 'op': 'shortest_path', 'start': 'A', 'target': 'C'},
+                {'id': 2, 'op': 'shortest_path', 'start': 'A', 'target': 'D'},
+                {'id': 3, 'op': 'mst'},
+                {'id': 4, 'op': 'components'},
+            ])
+
+        self.assertEqual(responses[1]['result'], {'distance': 5, 'path': ['A', 'B', 'C']})
+        self.assertEqual(responses[2]['result'], {'distance': None, 'path': None})
+        self.assertEqual(responses[3]['result']['weight'], 5)
+        self.assertEqual(len(responses[4]['result']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
+from util.file_reader import read_graph_from_file
+from util.snapshot import load_snapshot, save_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.snap')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_round_trip_graph(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        save_snapshot(graph, self.filename)
+        snapshot = load_snapshot(self.filename)
+
+        self.assertFalse(snapshot.is_directed)
+        self.assertFalse(snapshot.is_weighted())
+        self.assertEqual(snapshot.get_vertices(), graph.get_vertices())
+        self.assertTrue(snapshot.contains_vertex('F'))
+        self.assertFalse(snapshot.contains_vertex('Z'))
+        self.assertEqual(len(snapshot.find_shortest_path('A', 'F')), 4)
+        self.assertEqual(sorted(snapshot.find_vertices_n_away('A', 2)), ['D','E'])
+
+        thawed = snapshot.thaw()
+        self.assertIsInstance(thawed, Graph)
+        for vertex in graph.get_vertices():
+            self.assertCountEqual(thawed.get_neighbors(vertex), graph.get_neighbors(vertex))
+
+    def test_round_trip_weighted_graph(self):
+        graph = WeightedGraph(is_directed=True)
+        for vertex in ['start', 'middle', 'end']:
+            graph.add_vertex(vertex)
+        graph.add_edge('start', 'middle', 2.5)
+        graph.add_edge('middle', 'end', 4)
+        save_snapshot(graph, self.filename)
+        snapshot = load_snapshot(self.filename)
+
+        self.assertTrue(snapshot.is_directed)
+        self.assertEqual(list(snapshot.weights), [2.5, 4.0])
+        self.assertEqual(snapshot.get_neighbors('start'), ['middle'])
+
+        thawed = snapshot.thaw()
+        self.assertIsInstance(thawed, WeightedGraph)
+        self.assertEqual(thawed.find_shortest_path('start', 'end'), 6.5)
+
+    def test_not_a_snapshot(self):
+        with open(self.filename, 'w') as snapshot_file:
+            snapshot_file.write('G\nA,B\n(A,B)\n')
+
+        with self.assertRaises(ValueError):
+            load_snapshot(self.filename)
+
+    def test_truncated_snapshot(self):
+        graph = read_graph_from_file('test_files/graph_medium_undirected.txt')
+        save_snapshot(graph, self.filename)
+        with open(self.filename, 'rb') as snapshot_file:
+            data = snapshot_file.read()
+
+        # Cut inside the CSR sections and inside the id blob.
+        for size in (60, 150, len(data) - 1):
+            with open(self.filename, 'wb') as snapshot_file:
+                snapshot_file.write(data[:size])
+            with self.assertRaisesRegex(ValueError, 'truncated'):
+                load_snapshot(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
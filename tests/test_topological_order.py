@@ -0,0 +1,74 @@
+import random
+import unittest
+from graphs.graph import Graph
+
+
+class TestOnlineTopologicalOrder(unittest.TestCase):
+
+    def assertValidOrder(self, graph):
+        order = graph.get_topological_order()
+        self.assertCountEqual(order, graph.get_vertices())
+        position = {vertex_id: i for i, vertex_id in enumerate(order)}
+        for vertex_id in graph.get_vertices():
+            for neighbor_id in graph.get_neighbors(vertex_id):
+                self.assertLess(position[vertex_id], position[neighbor_id])
+
+    def test_order_is_maintained(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'EDCBA':
+            graph.add_vertex(vertex)
+        graph.enable_topological_order()
+        self.assertEqual(graph.get_topological_order(), ['E', 'D', 'C', 'B', 'A'])
+
+        graph.add_edge('A','C')
+        graph.add_edge('B','D')
+        graph.add_edge('C','D')
+        graph.add_edge('D','E')
+        graph.add_edge('A','B')
+        graph.add_vertex('F')
+        graph.add_edge('F','A')
+        self.assertValidOrder(graph)
+
+    def test_cycle_is_rejected(self):
+        graph = Graph(is_directed=True)
+        for vertex in 'ABC':
+            graph.add_vertex(vertex)
+        graph.enable_topological_order()
+        graph.add_edge('A','B')
+        graph.add_edge('B','C')
+
+        with self.assertRaises(ValueError):
+            graph.add_edge('C','A')
+        with self.assertRaises(ValueError):
+            graph.add_edge('B','B')
+        self.assertEqual(graph.get_neighbors('C'), [])
+        self.assertValidOrder(graph)
+
+    def test_random_edges(self):
+        rng = random.Random(7)
+        graph = Graph(is_directed=True)
+        for i in range(50):
+            graph.add_vertex(i)
+        graph.enable_topological_order()
+
+        for _ in range(300):
+            start_id, end_id = rng.randrange(50), rng.randrange(50)
+            try:
+                graph.add_edge(start_id, end_id)
+            except ValueError:
+                self.assertIsNotNone(graph.find_shortest_path(end_id, start_id))
+        self.assertFalse(graph.contains_cycle())
+        self.assertValidOrder(graph)
+
+    def test_enable_on_cyclic_or_undirected_graph(self):
+        graph = Graph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_edge('A','A')
+        with self.assertRaises(ValueError):
+            graph.enable_topological_order()
+        with self.assertRaises(ValueError):
+            Graph(is_directed=False).enable_topological_order()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from graphs.graph import Graph
+from graphs.heuristics import haversine
 from graphs.weighted_graph import WeightedGraph
 
 
@@ -51,6 +52,18 @@ class TestGraph(unittest.TestCase):
 
         self.assertEqual(sorted(graph.minimum_spanning_tree_kruskal()), expected_mst)
 
+    def test_mst_kruskal_forest(self):
+        graph = WeightedGraph(is_directed=False)
+        for vertex in 'ABCDE':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B', 3)
+        graph.add_edge('B','C', 1)
+        graph.add_edge('A','C', 2)
+        graph.add_edge('D','E', 5)
+
+        expected_forest = [('A', 'C', 2), ('B', 'C', 1), ('D', 'E', 5)]
+        self.assertEqual(sorted(graph.minimum_spanning_tree_kruskal()), expected_forest)
+
     def test_mst_prim(self):
         """Create a weighted graph."""
         graph = self.make_large_graph()
@@ -60,6 +73,28 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(
             graph.minimum_spanning_tree_prim(), expected_mst_weight)
 
+    def test_mst_prim_edges(self):
+        graph = self.make_large_graph()
+
+        edges, total_weight = graph.minimum_spanning_tree_prim(return_edges=True)
+        self.assertEqual(total_weight, 37)
+        self.assertEqual(len(edges), 8)
+        self.assertEqual(sum(weight for _, _, weight in edges), 37)
+
+    def test_mst_prim_forest(self):
+        """A disconnected graph gives a minimum spanning forest."""
+        graph = WeightedGraph(is_directed=False)
+        for vertex in 'ABCDE':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B', 3)
+        graph.add_edge('B','C', 1)
+        graph.add_edge('A','C', 2)
+        graph.add_edge('D','E', 5)
+
+        edges, total_weight = graph.minimum_spanning_tree_prim(return_edges=True)
+        self.assertEqual(total_weight, 8)
+        self.assertEqual(sorted(edges), [('A', 'C', 2), ('C', 'B', 1), ('D', 'E', 5)])
+
 
     def test_shortest_path(self):
         graph = self.make_large_graph()
@@ -69,5 +104,118 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(
             graph.find_shortest_path('A', 'J'), expected_shortest_path)
 
+    def test_shortest_path_with_path(self):
+        graph = self.make_large_graph()
+
+        distance, path = graph.find_shortest_path('A', 'J', return_path=True)
+        self.assertEqual(distance, 21)
+        self.assertEqual(path, ['A', 'C', 'F', 'H', 'J'])
+
+    def test_shortest_path_relaxes_through_cheaper_vertex(self):
+        graph = WeightedGraph(is_directed=True)
+        graph.add_vertex('A')
+        graph.add_vertex('B')
+        graph.add_vertex('C')
+        graph.add_vertex('D')
+        graph.add_edge('A','C', 5)
+        graph.add_edge('A','B', 1)
+        graph.add_edge('B','C', 1)
+
+        self.assertEqual(graph.find_shortest_path('A', 'C', return_path=True), (2, ['A', 'B', 'C']))
+        self.assertEqual(graph.find_shortest_path('A', 'D'), float('inf'))
+        self.assertEqual(graph.find_shortest_path('A', 'D', return_path=True), (float('inf'), None))
+
+    def test_shortest_path_tree(self):
+        graph = self.make_large_graph()
+
+        distances, parents = graph.shortest_path_tree('A')
+        self.assertEqual(distances['A'], 0)
+        self.assertEqual(distances['E'], 12)
+        self.assertEqual(distances['J'], 21)
+        self.assertEqual(len(distances), 9)
+        self.assertIsNone(parents['A'])
+        self.assertEqual(parents['J'], 'H')
+
+    def test_astar_matches_dijkstra(self):
+        graph = self.make_large_graph()
+        for target_id in 'ABCDEFGHJ':
+            cost, path = graph.astar('A', target_id)
+            self.assertEqual((cost, path), graph.find_shortest_path('A', target_id, return_path=True))
+
+        graph.add_vertex('K')
+        self.assertEqual(graph.astar('A', 'K'), (float('inf'), None))
+        with self.assertRaises(ValueError):
+            graph.astar('A', 'J', heuristic='euclidean')
+
+    def test_astar_euclidean_expands_fewer_vertices(self):
+        graph = WeightedGraph(is_directed=False)
+        coordinates = {}
+        for x in range(10):
+            for y in range(10):
+                coordinates[(x, y)] = (x, y)
+                graph.add_vertex((x, y))
+        for x, y in coordinates:
+            if x + 1 < 10:
+                graph.add_edge((x, y), (x + 1, y), 1)
+            if y + 1 < 10:
+                graph.add_edge((x, y), (x, y + 1), 1)
+        instrumentation = graph.enable_instrumentation()
+
+        dijkstra_cost = graph.find_shortest_path((0, 0), (9, 0))
+        cost, path = graph.astar((0, 0), (9, 0), coordinates=coordinates)
+        self.assertEqual(cost, dijkstra_cost)
+        self.assertEqual(len(path), 10)
+
+        dijkstra_stats, astar_stats = instrumentation.calls
+        self.assertLess(astar_stats.vertices_dequeued, dijkstra_stats.vertices_dequeued)
+
+    def test_haversine(self):
+        heuristic = haversine({'London': (51.5074, -0.1278), 'Paris': (48.8566, 2.3522)})
+        self.assertAlmostEqual(heuristic('London', 'Paris'), 343.5, delta=1)
+        self.assertEqual(heuristic('Paris', 'Paris'), 0)
+
+    def test_frozen_shortest_path_tree(self):
+        graph = self.make_large_graph()
+        frozen = graph.freeze()
+
+        self.assertEqual(frozen.shortest_path_tree('A'), graph.shortest_path_tree('A'))
+        self.assertEqual(sorted(frozen.iter_neighbors_with_weights('J')),
+            [('G', 9.0), ('H', 10.0)])
+
+    def test_vertices_have_no_instance_dict(self):
+        graph = self.make_large_graph()
+        vertex = graph.get_vertex('A')
+        self.assertFalse(hasattr(vertex, '__dict__'))
+        self.assertEqual([(neighbor.id, weight) for neighbor, weight
+            in vertex.iter_neighbors_with_weights()], [('B', 4), ('C', 8)])
+
+    def test_floyd_warshall(self):
+        graph = self.make_large_graph()
+
+        dist, index = graph.floyd_warshall()
+        self.assertEqual(list(index), ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'J'])
+        for start_id in index:
+            distances, _ = graph.shortest_path_tree(start_id)
+            for end_id in index:
+                self.assertEqual(dist[index[start_id]][index[end_id]], distances[end_id])
+
+    def test_floyd_warshall_predecessors(self):
+        graph = WeightedGraph(is_directed=True)
+        for vertex in 'ABCD':
+            graph.add_vertex(vertex)
+        graph.add_edge('A','B', 1)
+        graph.add_edge('B','C', 1)
+        graph.add_edge('A','C', 5)
+
+        dist, index, pred = graph.floyd_warshall(return_predecessors=True)
+        a, b, c, d = index['A'], index['B'], index['C'], index['D']
+        self.assertEqual(dist[a][c], 2)
+        self.assertEqual(dist[c][a], float('inf'))
+        self.assertEqual(dist[d][d], 0)
+        self.assertEqual(pred[a][c], b)
+        self.assertEqual(pred[a][b], a)
+        self.assertEqual(pred[a][d], -1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
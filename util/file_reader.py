@@ -1,41 +1,110 @@
+import os
+
 from graphs.graph import Graph
+from graphs.weighted_graph import WeightedGraph
 
 
-def read_graph_from_file(filename):
+def read_graph_from_file(source, weighted=None):
     """
-    Read in data from the specified filename, and create and return a graph
+    Read in data from the specified file, and create and return a graph
     object corresponding to that data.
 
+    The file is parsed one line at a time, so only the graph itself is kept in
+    memory. The expected format is:
+
+        G or D                  (undirected or directed)
+        A,B,C                   (comma-separated vertex ids)
+        (A,B)                   (one edge per line, or (A,B,weight))
+
     Arguments:
-    filename (string): The relative path of the file to be processed
+    source (string or file): The path of the file to be processed, or an
+        already open file object (any iterable of lines).
+    weighted (boolean): Whether to build a WeightedGraph. If None, this is
+        decided by whether the first edge has a weight.
 
     Returns:
-    Graph: A directed or undirected Graph object containing the specified
-    vertices and edges
+    Graph or WeightedGraph: A directed or undirected graph object containing
+    the specified vertices and edges
     """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as graph_file:
+            return _read_graph(graph_file, weighted)
+    return _read_graph(source, weighted)
 
-    # Use 'open' to open the file
-    with open(filename) as graph_file:
-        graph_file_lines = graph_file.readlines()
 
-    # Use the first line (G or D) to determine whether graph is directed 
-    # and create a graph object
-    direction = graph_file_lines[0].strip()
+def _read_graph(lines, weighted):
+    """Build a graph from an iterable of lines in the graph file format."""
+    weight_required = weighted
+    lines = (line.strip() for line in lines)
+    lines = (line for line in lines if line)
+
+    # Use the first line (G or D) to determine whether graph is directed
+    direction = next(lines, None)
     if direction != 'G' and direction != 'D':
-        raise ValueError('File is in an imporper format')
-    graph = Graph(is_directed=direction is 'D')
+        raise ValueError('File is in an improper format')
+    is_directed = direction == 'D'
+
+    # Use the second line to get the vertices of the graph
+    vertex_line = next(lines, None)
+    if vertex_line is None:
+        raise ValueError('File is missing its line of vertices')
+    vertex_ids = [vertex.strip() for vertex in vertex_line.split(',')
+        if vertex.strip()]
+    known_ids = set(vertex_ids)
 
-    # Use the second line to add the vertices to the graph
-    for vertex in graph_file_lines[1].strip().split(','):
-        graph.add_vertex(vertex)
+    # Use the 3rd+ line to add the edges to the graph. The graph is only
+    # created once the first edge tells us whether it is weighted.
+    graph = None
+    for line in lines:
+        edge = _parse_edge(line)
+        if graph is None:
+            if weighted is None:
+                weighted = len(edge) == 3
+            graph = _make_graph(is_directed, weighted, vertex_ids)
 
-    # Use the 3rd+ line to add the edges to the graph
-    for edge in graph_file_lines[2:]:
-        edge = edge.strip().split(',')
-        graph.add_edge(edge[0][1], edge[1][0])
+        # Checked here for both graph types: Graph.add_edge raises KeyError
+        # but WeightedGraph.add_edge would quietly skip the edge.
+        if edge[0] not in known_ids or edge[1] not in known_ids:
+            raise ValueError(f'Edge references unknown vertex: {line}')
+        if weighted:
+            if len(edge) != 3:
+                raise ValueError(f'Edge is missing its weight: {line}')
+            graph.add_edge(edge[0], edge[1], _parse_weight(edge[2], line))
+        else:
+            if len(edge) == 3 and weight_required is None:
+                raise ValueError(f'Unexpected weight on edge: {line}')
+            graph.add_edge(edge[0], edge[1])
 
-    graph_file.close()
+    if graph is None:
+        graph = _make_graph(is_directed, bool(weighted), vertex_ids)
     return graph
 
 
-read_graph_from_file('./test_files/graph_small_directed.txt')
\ No newline at end of file
+def _make_graph(is_directed, weighted, vertex_ids):
+    """Create an empty graph of the right type and add the vertices to it."""
+    graph = WeightedGraph(is_directed) if weighted else Graph(is_directed)
+    for vertex_id in vertex_ids:
+        graph.add_vertex(vertex_id)
+    return graph
+
+
+def _parse_edge(line):
+    """Split an edge line such as `(A,B)` or `(A,B,3)` into its fields."""
+    if not (line.startswith('(') and line.endswith(')')):
+        raise ValueError(f'Edge is in an improper format: {line}')
+    edge = [field.strip() for field in line[1:-1].split(',')]
+    if len(edge) not in (2, 3) or not edge[0] or not edge[1]:
+        raise ValueError(f'Edge is in an improper format: {line}')
+    return edge
+
+
+def _parse_weight(weight, line):
+    """Return the edge weight as an int if possible, otherwise a float."""
+    try:
+        return int(weight)
+    except ValueError:
+        pass
+    try:
+        return float(weight)
+    except ValueError:
+        raise ValueError(f'Edge has an invalid weight: {line}') from None
@@ -0,0 +1,255 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from graphs.csr_graph import CSRGraph
+
+
+# Snapshot layout (all integers little-endian, every section 8-byte aligned):
+#
+#   header       magic, version, flags, vertex count, edge count, id bytes
+#   id_offsets   int64[V + 1]  start of each id in the id blob
+#   id_order     int64[V]      vertex indices sorted by their encoded id
+#   offsets      int64[V + 1]  CSR offsets
+#   targets      int32[E]      CSR targets
+#   weights      float64[E]    edge weights (weighted graphs only)
+#   id_blob      bytes         the UTF-8 encoded ids, back to back
+MAGIC = b'GRAPHSNP'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqqq')
+
+FLAG_DIRECTED = 1
+FLAG_WEIGHTED = 2
+
+
+def save_snapshot(graph, filename):
+    """
+    Write `graph` to `filename` in the binary snapshot format.
+
+    Vertex ids are stored as strings.
+
+    Parameters:
+    graph (Graph, WeightedGraph or CSRGraph): The graph to save.
+    filename (string): The path of the snapshot file to write.
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = graph.freeze()
+
+    encoded_ids, id_offsets = encode_ids(graph.ids)
+    id_order = array('q', sorted(range(len(encoded_ids)),
+        key=encoded_ids.__getitem__))
+
+    flags = (FLAG_DIRECTED if graph.is_directed else 0) | \
+        (FLAG_WEIGHTED if graph.is_weighted() else 0)
+    sections = [id_offsets, id_order, array('q', graph.offsets),
+        array('i', graph.targets)]
+    if graph.is_weighted():
+        sections.append(array('d', graph.weights))
+
+    header = HEADER.pack(MAGIC, VERSION, flags, len(graph.ids),
+        len(graph.targets), id_offsets[-1])
+    write_binary_file(filename, header, sections, encoded_ids)
+
+
+def load_snapshot(filename):
+    """
+    Memory-map the snapshot at `filename` and return it as a frozen graph.
+
+    No data is copied: the CSR arrays and the id table are read straight from
+    the mapped file, so loading is independent of the graph size and processes
+    mapping the same file share its pages.
+
+    Parameters:
+    filename (string): The path of the snapshot file to load.
+
+    Returns:
+    CSRGraph: The frozen graph, backed by the mapped file.
+    """
+    if sys.byteorder != 'little':
+        raise ValueError('Snapshots can only be mapped on little-endian machines')
+
+    with open(filename, 'rb') as snapshot_file:
+        buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    reader = SectionReader(buffer, HEADER, MAGIC, VERSION, 'graph snapshot')
+    flags, num_vertices, num_edges, id_bytes = reader.fields
+    id_offsets = reader.section('q', num_vertices + 1)
+    id_order = reader.section('q', num_vertices)
+    offsets = reader.section('q', num_vertices + 1)
+    targets = reader.section('i', num_edges)
+    weights = reader.section('d', num_edges) if flags & FLAG_WEIGHTED else None
+    id_blob = reader.blob(id_bytes)
+
+    ids = MappedIds(id_blob, id_offsets)
+    # The memoryviews keep the mapping open for as long as the graph is alive.
+    return CSRGraph(ids, offsets, targets, bool(flags & FLAG_DIRECTED),
+        MappedIndex(ids, id_order), weights)
+
+
+def encode_ids(ids):
+    """
+    Encode vertex ids for an id blob.
+
+    Returns:
+    tuple<list, array>: The UTF-8 encoded ids, and an int64 array of the
+    start of each id in the blob, with one extra trailing entry holding the
+    blob size.
+    """
+    encoded_ids = [str(vertex_id).encode('utf-8') for vertex_id in ids]
+    id_offsets = array('q', [0])
+    for encoded_id in encoded_ids:
+        id_offsets.append(id_offsets[-1] + len(encoded_id))
+    return encoded_ids, id_offsets
+
+
+def decode_ids(id_blob, id_offsets):
+    """Return the list of ids stored in an id blob written by `encode_ids`."""
+    return [bytes(id_blob[id_offsets[i]:id_offsets[i + 1]]).decode('utf-8')
+        for i in range(len(id_offsets) - 1)]
+
+
+def write_binary_file(filename, header, sections, encoded_ids):
+    """
+    Write a binary file in the layout shared by snapshots, landmark files and
+    contraction hierarchies: the packed header, each section little-endian
+    and 8-byte aligned, then the id blob.
+
+    Parameters:
+    filename (string): The path of the file to write.
+    header (bytes): The packed header.
+    sections (list<array>): The arrays to write, in order.
+    encoded_ids (list<bytes>): The encoded ids, from `encode_ids`.
+    """
+    with open(filename, 'wb') as binary_file:
+        binary_file.write(header)
+        binary_file.write(bytes(_padding(len(header))))
+        for section in sections:
+            if sys.byteorder != 'little':
+                section = array(section.typecode, section)
+                section.byteswap()
+            binary_file.write(section)
+            binary_file.write(bytes(_padding(len(section) * section.itemsize)))
+        for encoded_id in encoded_ids:
+            binary_file.write(encoded_id)
+
+
+class SectionReader:
+    """
+    Reads the sections of a file written by `write_binary_file`, in order,
+    checking the header first and that no section runs past the end.
+    """
+    def __init__(self, buffer, header, magic, version, kind):
+        """
+        Parameters:
+        buffer (bytes or mmap): The contents of the file.
+        header (struct.Struct): The header layout; it must start with the
+            magic bytes and the version.
+        magic (bytes): The expected magic bytes.
+        version (integer): The supported version.
+        kind (string): What the file holds, for error messages.
+
+        Raises ValueError if the header does not match.
+        """
+        if len(buffer) < header.size:
+            raise ValueError(f'File is not a {kind}')
+        fields = header.unpack_from(buffer)
+        if fields[0] != magic:
+            raise ValueError(f'File is not a {kind}')
+        if fields[1] != version:
+            raise ValueError(f'Unsupported {kind} version {fields[1]}')
+
+        self.fields = fields[2:] # the header fields after magic and version
+        self.view = memoryview(buffer)
+        self.kind = kind
+        self.position = header.size + _padding(header.size)
+
+    def section(self, typecode, length):
+        """
+        Return the next section of `length` items of type `typecode`.
+
+        The section is a view of the buffer on little-endian machines, and a
+        byteswapped copy elsewhere.
+        """
+        size = length * struct.calcsize(typecode)
+        data = self.blob(size).cast(typecode)
+        self.position += _padding(size)
+        if sys.byteorder != 'little':
+            data = array(typecode, data)
+            data.byteswap()
+        return data
+
+    def blob(self, size):
+        """Return a view of the next `size` bytes."""
+        if self.position + size > len(self.view):
+            raise ValueError(f'{self.kind.capitalize()} is truncated')
+        data = self.view[self.position:self.position + size]
+        self.position += size
+        return data
+
+
+def _padding(size):
+    """Return the number of bytes needed to align `size` to 8 bytes."""
+    return -size % 8
+
+
+class MappedIds:
+    """
+    A read-only sequence of vertex ids, decoded on demand from a mapped id
+    blob.
+    """
+    def __init__(self, id_blob, id_offsets):
+        self.id_blob = id_blob
+        self.id_offsets = id_offsets
+
+    def encoded(self, i):
+        """Return the UTF-8 bytes of the id with index `i`."""
+        return bytes(self.id_blob[self.id_offsets[i]:self.id_offsets[i + 1]])
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('vertex index out of range')
+        return self.encoded(i).decode('utf-8')
+
+    def __len__(self):
+        return len(self.id_offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.encoded(i).decode('utf-8')
+
+
+class MappedIndex:
+    """
+    A read-only id -> index map over mapped ids, answered by binary search of
+    the sorted id order instead of building a dict at load time.
+    """
+    def __init__(self, ids, id_order):
+        self.ids = ids
+        self.id_order = id_order
+
+    def get(self, vertex_id, default=None):
+        """Return the index of `vertex_id`, or `default` if it is missing."""
+        if not isinstance(vertex_id, str):
+            return default
+        key = vertex_id.encode('utf-8')
+        order = self.id_order
+        position = bisect_left(order, key, key=self.ids.encoded)
+        if position < len(order) and self.ids.encoded(order[position]) == key:
+            return order[position]
+        return default
+
+    def __getitem__(self, vertex_id):
+        i = self.get(vertex_id)
+        if i is None:
+            raise KeyError(vertex_id)
+        return i
+
+    def __contains__(self, vertex_id):
+        return self.get(vertex_id) is not None
+
+    def __len__(self):
+        return len(self.id_order)